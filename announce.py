@@ -0,0 +1,83 @@
+import asyncio, logging
+from typing import Callable, Optional
+
+import discord
+
+from utils import MAX_EMBEDS
+
+class Announcer:
+	"""
+	Posts announcements to a channel from a queue. Announcements with more than ten embeds are split into
+	ordered chunks; messages are sent one at a time so they keep their order, while publishing them runs in
+	the background so a slow publish never holds up the next message.
+	"""
+
+	def __init__(self, channel: Callable[[], Optional[discord.abc.Messageable]], publish_concurrency: int = 2):
+		"""
+		Args:
+			channel: Gets the channel to post in, or None if it isn't available
+			publish_concurrency: Maximum number of messages being published at once
+		"""
+		self.channel = channel
+		self.queue: asyncio.Queue[tuple[str, list[discord.Embed]]] = asyncio.Queue()
+		self.publishing = asyncio.Semaphore(publish_concurrency)
+		self.publishes: set[asyncio.Task] = set()
+		self.task: Optional[asyncio.Task] = None
+
+	def start(self):
+		if self.task and not self.task.done():
+			return
+		self.task = asyncio.create_task(self.worker())
+
+	async def stop(self):
+		if self.task:
+			self.task.cancel()
+			await asyncio.gather(self.task, return_exceptions=True)
+		await asyncio.gather(*self.publishes, return_exceptions=True)
+
+	def announce(self, content: Callable[[int, int], str], embeds: list[discord.Embed]):
+		"""
+		Queue an announcement.
+
+		Args:
+			content: Builds the message text from the chunk number and chunk count (both starting at 1)
+			embeds: Every embed of the announcement, in order
+		"""
+		chunks = [embeds[i:i + MAX_EMBEDS] for i in range(0, len(embeds), MAX_EMBEDS)] or [[]]
+		for number, chunk in enumerate(chunks, 1):
+			self.queue.put_nowait((content(number, len(chunks)), chunk))
+
+	async def worker(self):
+		while True:
+			content, embeds = await self.queue.get()
+			try:
+				await self.send(content, embeds)
+			except Exception: # anything unexpected only loses this message, never the worker
+				logging.exception("Error sending announcement")
+			finally:
+				self.queue.task_done()
+
+	async def send(self, content: str, embeds: list[discord.Embed]):
+		channel = self.channel()
+		if channel is None:
+			logging.warning("Announcement channel unavailable, dropping announcement")
+			return
+
+		try:
+			message = await channel.send(content=content, embeds=embeds)
+		except discord.HTTPException as e:
+			logging.error(f"Error sending announcement: {e}", exc_info=True)
+			return
+
+		task = asyncio.create_task(self.publish(message))
+		self.publishes.add(task)
+		task.add_done_callback(self.publishes.discard)
+
+	async def publish(self, message: discord.Message):
+		async with self.publishing:
+			try:
+				await message.publish()
+			except discord.Forbidden:
+				pass
+			except discord.HTTPException as e:
+				logging.error(f"Error publishing announcement: {e}", exc_info=True)
@@ -0,0 +1,117 @@
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from cache import TTLCache, MISSING
+from db import normalize_name
+
+class AutocompleteService:
+	"""
+	Front for a name search backend used by autocomplete handlers.
+
+	Identical queries that are already running share one backend call, results are cached, and a query
+	whose shorter prefix has a complete cached result is answered by filtering that result locally. Each
+	user only gets an answer for their latest keystroke; superseded requests are dropped before they reach
+	the backend when possible.
+	"""
+
+	def __init__(
+		self,
+		search: Callable[[str], Awaitable[list[dict]]],
+		name: Callable[[dict], str],
+		substring_from: Optional[int] = None,
+		limit: int = 25,
+		debounce: float = 0.25,
+		ttl: float = 30
+	):
+		"""
+		Args:
+			search: Backend search coroutine, returning at most `limit` results
+			name: Gets the searched name from a result
+			substring_from: Query length from which the backend also returns names that merely contain the
+				query (after the ones starting with it), or None if it only matches prefixes
+			limit: Maximum number of results the backend returns
+			debounce: Seconds to wait for a newer keystroke before querying the backend
+			ttl: Seconds to keep results cached
+		"""
+		self.search = search
+		self.name = name
+		self.substring_from = substring_from
+		self.limit = limit
+		self.debounce = debounce
+		self.cache = TTLCache(ttl=ttl)
+		self.in_flight: dict[str, asyncio.Task] = {}
+		self.latest: dict[int, int] = {}
+		self.sequence = 0
+
+	async def query(self, user_id: int, query: str) -> Optional[list[dict]]:
+		"""
+		Get the results for a user's current input.
+
+		Returns:
+			list: The matching results, or None if a newer request from the same user superseded this one
+		"""
+		self.sequence += 1
+		token = self.sequence
+		self.latest[user_id] = token
+
+		try:
+			query = normalize_name(query)
+			results = self.cached(query)
+
+			if results is None:
+				await asyncio.sleep(self.debounce)
+				if self.latest.get(user_id) != token:
+					return None
+
+				results = await self.fetch(query)
+
+			return results if self.latest.get(user_id) == token else None
+		finally:
+			if self.latest.get(user_id) == token:
+				del self.latest[user_id]
+
+	def cached(self, query: str) -> Optional[list[dict]]:
+		"""Answer from the cache, either directly or by narrowing a complete result for a shorter prefix"""
+		results = self.cache.get(query)
+		if results is not MISSING:
+			return results
+
+		substring = self.substring_from is not None and len(query) >= self.substring_from
+
+		for length in range(len(query) - 1, 0, -1):
+			prefix = query[:length]
+			if substring and length < self.substring_from:
+				break
+
+			results = self.cache.get(prefix)
+			if results is MISSING:
+				continue
+			if len(results) >= self.limit:
+				break
+
+			if substring:
+				results = [result for result in results if query in normalize_name(self.name(result))]
+				results.sort(key=lambda result: (not normalize_name(self.name(result)).startswith(query), normalize_name(self.name(result))))
+			else:
+				results = [result for result in results if normalize_name(self.name(result)).startswith(query)]
+
+			self.cache.set(query, results)
+			return results
+
+		return None
+
+	async def fetch(self, query: str) -> list[dict]:
+		task = self.in_flight.get(query)
+		if task is None:
+			task = asyncio.create_task(self.search(query))
+			self.in_flight[query] = task
+			task.add_done_callback(lambda done: self.finish(query, done))
+
+		return await asyncio.shield(task)
+
+	def finish(self, query: str, task: asyncio.Task):
+		if self.in_flight.get(query) is task:
+			del self.in_flight[query]
+
+		if not task.cancelled() and task.exception() is None:
+			self.cache.set(query, task.result())
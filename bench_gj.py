@@ -0,0 +1,242 @@
+"""
+Micro-benchmark of the GJ response parser against the split-and-dict parsing it replaced.
+
+The sample responses mirror getGJLevels21/getGJUsers20 responses: every level carries the full set of
+keys the servers send, including a base64 description, and the creators, songs, page and hash sections
+are present. Besides parsing unrelated responses cold, it replays a sequence of consecutive polls in which
+a few levels are bumped to the top each time, as the sent list behaves between polls.
+
+Responses captured from the servers with --capture are saved in fixtures/gj and, when present, checked and
+timed as well, since real output can differ from the samples in key order, empty fields or missing sections.
+
+Usage:
+	python bench_gj.py [iterations]
+	python bench_gj.py --capture POLLS [--user NAME]
+"""
+import argparse, asyncio, os, random, timeit
+
+import aiohttp
+
+import gj
+from utils import DEMON_MAP, SENT_LEVEL, RATED_LEVEL, sent_level, rated_level
+
+def sample_level(rng: random.Random, level_id: int, rated: bool) -> str:
+	stars = rng.choice((0, 2, 5, 10)) if rated else 0
+	pairs = {
+		1: level_id, 2: f"Level {level_id}", 5: 1, 6: rng.randint(1, 30000000), 8: 10, 9: rng.choice((0, 10, 20, 30)),
+		10: rng.randint(0, 10**6), 12: 0, 13: 22, 14: rng.randint(-100, 10**5), 17: int(stars == 10), 43: rng.choice((0, 3, 4, 5, 6)),
+		25: "", 18: stars, 19: int(rated and rng.random() < 0.3), 42: int(rated and rng.random() < 0.1), 45: rng.randint(0, 10**5),
+		3: "VGhpcyBpcyBhIHNhbXBsZSBsZXZlbCBkZXNjcmlwdGlvbiBmb3IgdGhlIGJlbmNobWFyaw==", 15: rng.randint(0, 5),
+		30: 0, 31: 0, 37: 0, 38: 0, 39: 0, 46: 1, 47: 2, 35: rng.randint(10**5, 10**6), 57: 0
+	}
+	if rng.random() < 0.2: # the servers leave out some keys, which then take their defaults
+		del pairs[43], pairs[42]
+	return ":".join(f"{key}:{value}" for key, value in pairs.items())
+
+SONGS = "1~|~123~|~2~|~Song~|~3~|~1~|~4~|~Artist~|~5~|~4.5~|~6~|~~|~10~|~https://example.com/song.mp3"
+HASH = "abcdef0123456789abcdef0123456789abcdef01"
+
+def sample_levels_response(seed: int, rated: bool, count: int = 10) -> str:
+	rng = random.Random(seed)
+	levels = [sample_level(rng, 100000000 + seed * 100 + i, rated) for i in range(count)]
+	creators = [f"{rng.randint(1, 30000000)}:Creator{i}:{rng.randint(1, 30000000)}" for i in range(count)]
+	return "#".join(("|".join(levels), "|".join(creators), SONGS, f"9999:0:{count}", HASH))
+
+def poll_sequence(seed: int, rated: bool, polls: int = 60, count: int = 10) -> list[str]:
+	"""Consecutive responses of one list, with up to three levels (old or new) bumped to the top between polls"""
+	rng = random.Random(seed)
+	entries = {}
+	def entry(level_id: int) -> tuple[str, str]:
+		if level_id not in entries:
+			entries[level_id] = (sample_level(rng, level_id, rated), f"{rng.randint(1, 30000000)}:Creator{level_id}:{rng.randint(1, 30000000)}")
+		return entries[level_id]
+
+	order = [200000000 + i for i in range(count * 3)]
+	next_id = order[-1] + 1
+	responses = []
+	for _ in range(polls):
+		for _ in range(rng.choice((0, 0, 1, 1, 2, 3))):
+			if rng.random() < 0.5:
+				level_id = order.pop(rng.randrange(len(order)))
+			else:
+				level_id, next_id = next_id, next_id + 1
+			order.insert(0, level_id)
+
+		page = [entry(level_id) for level_id in order[:count]]
+		responses.append("#".join((
+			"|".join(level for level, _ in page), "|".join(creator for _, creator in page), SONGS, f"9999:0:{count}", HASH
+		)))
+
+	return responses
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "gj")
+
+async def capture(polls: int, username: str, interval: float = 10):
+	"""Save `polls` consecutive polls of the sent and rated lists, and one user lookup, as fixtures"""
+	os.makedirs(FIXTURES, exist_ok=True)
+	async with aiohttp.ClientSession(headers={"User-Agent": ""}) as session:
+		async def post(url: str, data: dict) -> str:
+			async with session.post(url, data=data | {"secret": "Wmfd2893gb7"}) as response:
+				return await response.text()
+
+		def save(name: str, text: str):
+			with open(os.path.join(FIXTURES, name), "w") as file:
+				file.write(text)
+
+		for poll in range(polls):
+			for type in (27, 11): # sent, rated
+				save(f"levels_{type}_{poll:03}.txt", await post("http://www.boomlings.com/database/getGJLevels21.php", {"type": type, "page": 0}))
+			if poll + 1 < polls:
+				await asyncio.sleep(interval)
+
+		save(f"users_{username}.txt", await post("http://www.boomlings.com/database/getGJUsers20.php", {"str": username}))
+
+def load_fixtures(prefix: str) -> list[str]:
+	"""Captured responses whose file name starts with `prefix`, in capture order, skipping error responses"""
+	if not os.path.isdir(FIXTURES):
+		return []
+
+	texts = []
+	for name in sorted(os.listdir(FIXTURES)):
+		if name.startswith(prefix):
+			with open(os.path.join(FIXTURES, name)) as file:
+				text = file.read()
+			if not text.startswith("-"):
+				texts.append(text)
+	return texts
+
+SAMPLE_USER = "1:Creator0:2:123456:13:1:17:10:6::9:1:10:12:11:3:14:0:15:0:16:654321:3:100:8:0:4:5:7:123456:46:10#1:0:10"
+
+def legacy_sent(text: str) -> tuple[list[dict], list[dict]]:
+	parsed = text.split("#")
+	levels = []
+	for level in parsed[0].split("|"):
+		parts = level.split(":")
+		data = {parts[i]: parts[i + 1] for i in range(0, len(parts), 2)}
+		_15 = int(data.get("15", 0))
+		levels.append({"_id": int(data["1"]), "name": data["2"], "creatorID": int(data["6"]), "length": _15, "platformer": (_15 == 5)})
+
+	creators = []
+	for creator in parsed[1].split("|"):
+		parts = creator.split(":")
+		try:
+			accountID = int(parts[2])
+		except Exception:
+			accountID = 0
+		creators.append({"_id": int(parts[0]), "name": parts[1], "accountID": accountID})
+
+	return levels, creators
+
+def legacy_rated(text: str) -> tuple[list[dict], list[dict]]:
+	parsed = text.split("#")
+	levels = []
+	for level in parsed[0].split("|"):
+		parts = level.split(":")
+		data = {parts[i]: parts[i + 1] for i in range(0, len(parts), 2)}
+		_15 = int(data.get("15", 0))
+		_18 = int(data.get("18", 0))
+		_42 = int(data.get("42", 0))
+		levels.append({
+			"_id": int(data["1"]), "name": data["2"], "creatorID": int(data["6"]), "length": _15, "platformer": (_15 == 5),
+			"difficulty": DEMON_MAP.get(int(data.get("43", 3)), 0), "stars": _18,
+			"points": (1 if _18 > 0 else 0) + (1 if int(data.get("19", 0)) > 0 else 0) + (_42 if _42 > 0 else 0)
+		})
+
+	creators = []
+	for creator in parsed[1].split("|"):
+		parts = creator.split(":")
+		creators.append({"_id": int(parts[0]), "name": parts[1], "accountID": int(parts[2])})
+
+	return levels, creators
+
+def legacy_user(text: str) -> tuple[str, int, int]:
+	split = text.split(":")
+	pairs = {int(split[i]): split[i+1] for i in range(0, len(split), 2)}
+	return pairs[1], int(pairs[2]), int(pairs[16])
+
+def parse_sent(text: str) -> tuple[list[dict], list[dict]]:
+	response = gj.parse_levels(text, SENT_LEVEL)
+	return [sent_level(level) for level in response.levels], response.creators
+
+def parse_rated(text: str) -> tuple[list[dict], list[dict]]:
+	response = gj.parse_levels(text, RATED_LEVEL)
+	return [rated_level(level) for level in response.levels], response.creators
+
+def parse_user(text: str) -> tuple[str, int, int]:
+	users, _ = gj.parse_users(text)
+	return users[0]["name"], users[0]["playerID"], users[0]["accountID"]
+
+def clear_memos():
+	for schema in (SENT_LEVEL, RATED_LEVEL, gj.LEVEL, gj.CREATOR, gj.USER):
+		schema.memo.clear()
+
+def bench(name: str, func, samples: list[str], iterations: int, cold: bool = False):
+	"""
+	Time parsing `samples` in order, taking the best of several runs. Memos are cleared before each run,
+	or before every response when `cold` is set.
+	"""
+	def run():
+		clear_memos()
+		for sample in samples:
+			if cold:
+				clear_memos()
+			func(sample)
+
+	seconds = min(timeit.repeat(run, number=iterations, repeat=5))
+	per_call = seconds / (iterations * len(samples)) * 1e6
+	print(f"{name:<32} {per_call:8.2f} µs/response")
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the GJ response parser")
+	parser.add_argument("iterations", type=int, nargs="?", default=200)
+	parser.add_argument("--capture", type=int, metavar="POLLS", help="save this many live polls as fixtures instead")
+	parser.add_argument("--user", default="RobTop", help="username looked up when capturing")
+	args = parser.parse_args()
+
+	if args.capture:
+		asyncio.run(capture(args.capture, args.user))
+		return
+
+	iterations = args.iterations
+	sent = [sample_levels_response(seed, False) for seed in range(20)]
+	rated = [sample_levels_response(seed, True) for seed in range(20, 40)]
+	sent_polls = poll_sequence(1, False)
+	rated_polls = poll_sequence(2, True)
+
+	# the parsers must agree before their speed means anything, including on memoized entries
+	clear_memos()
+	for text in sent + sent_polls:
+		assert parse_sent(text) == legacy_sent(text)
+	for text in rated + rated_polls:
+		assert parse_rated(text) == legacy_rated(text)
+	assert parse_user(SAMPLE_USER) == legacy_user(SAMPLE_USER)
+
+	captured_sent, captured_rated, captured_users = load_fixtures("levels_27_"), load_fixtures("levels_11_"), load_fixtures("users_")
+	for text in captured_sent:
+		assert parse_sent(text) == legacy_sent(text)
+	for text in captured_rated:
+		assert parse_rated(text) == legacy_rated(text)
+	for text in captured_users:
+		assert parse_user(text) == legacy_user(text.split("#")[0].split("|")[0])
+	if not captured_sent and not captured_rated:
+		print(f"No captured responses in {FIXTURES}, timing generated samples only (see --capture)")
+
+	bench("legacy sent levels", legacy_sent, sent, iterations)
+	bench("gj sent levels (cold)", parse_sent, sent, iterations, cold=True)
+	bench("legacy rated levels", legacy_rated, rated, iterations)
+	bench("gj rated levels (cold)", parse_rated, rated, iterations, cold=True)
+	bench("legacy sent polls", legacy_sent, sent_polls, iterations)
+	bench("gj sent polls", parse_sent, sent_polls, iterations)
+	bench("legacy rated polls", legacy_rated, rated_polls, iterations)
+	bench("gj rated polls", parse_rated, rated_polls, iterations)
+	if captured_sent:
+		bench("legacy captured sent polls", legacy_sent, captured_sent, iterations)
+		bench("gj captured sent polls", parse_sent, captured_sent, iterations)
+	if captured_rated:
+		bench("legacy captured rated polls", legacy_rated, captured_rated, iterations)
+		bench("gj captured rated polls", parse_rated, captured_rated, iterations)
+	bench("legacy user", legacy_user, [SAMPLE_USER], iterations * 20)
+	bench("gj user (cold)", parse_user, [SAMPLE_USER], iterations * 20, cold=True)
+
+if __name__ == "__main__":
+	main()
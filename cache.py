@@ -0,0 +1,50 @@
+import threading, time
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable
+
+MISSING = object()
+
+class TTLCache:
+	"""Thread-safe LRU cache whose entries also expire after a fixed time-to-live"""
+
+	def __init__(self, maxsize: int = 4096, ttl: float = 60):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+		self.lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, key: Hashable, default: Any = MISSING) -> Any:
+		"""Get a cached value, or `default` if it's missing or expired"""
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is None or entry[0] < time.monotonic():
+				if entry is not None:
+					del self.entries[key]
+				self.misses += 1
+				return default
+
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return entry[1]
+
+	def set(self, key: Hashable, value: Any):
+		with self.lock:
+			self.entries[key] = (time.monotonic() + self.ttl, value)
+			self.entries.move_to_end(key)
+			while len(self.entries) > self.maxsize:
+				self.entries.popitem(last=False)
+
+	def invalidate(self, keys: Iterable[Hashable]):
+		with self.lock:
+			for key in keys:
+				self.entries.pop(key, None)
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+
+	def stats(self) -> dict:
+		with self.lock:
+			return {"hits": self.hits, "misses": self.misses, "size": len(self.entries)}
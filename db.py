@@ -1,20 +1,105 @@
-import re
-from typing import Optional
-from pymongo import UpdateOne
+import re, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from functools import partial
+from typing import Optional, Callable
+from pymongo import InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import ConfigurationError, OperationFailure
 from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi, ServerApiVersion
 from pymongo.collection import Collection
 from pymongo.database import Database
+from cache import TTLCache, MISSING
+from metrics import Counters
+from follows import FollowGraph
 from datetime import datetime, UTC, timedelta
 
+RANK_REFRESH_INTERVAL = timedelta(minutes=10)
+
+TRENDING_WINDOW_HOURS = 30 * 24
+# 25000 / (age_days + 2) for a send in a bucket `age` hours before the current one, taken at the bucket midpoint
+TRENDING_WEIGHTS = [25000 / ((age + 0.5) / 24 + 2) for age in range(TRENDING_WINDOW_HOURS)]
+
+# Views are maintained in their live collection and published to readers as snapshots along with the rank
+# refresh. Between snapshots the cheap incremental changes are applied to the published collection as well.
+LEVEL_STATS_LIVE = "level_stats_live"
+CREATOR_STATS_LIVE = "creator_stats_live"
+VIEW_INDEXES = {
+	"level_stats": [
+		[("send_count", -1)],
+		[("trending_score", -1)],
+		[("rank", 1)],
+		[("has_rate", 1), ("rate_rank", 1)],
+		[("platformer", 1), ("gamemode_rank", 1)],
+		[("has_rate", 1), ("platformer", 1), ("joined_rank", 1)]
+	],
+	"creator_stats": [
+		[("rank", 1)],
+		[("send_count", -1)]
+	]
+}
+
+def hour_bucket(timestamp: datetime) -> datetime:
+	return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def normalize_name(name: str) -> str:
+	return name.strip().casefold()
+
+def name_trigrams(name: str) -> list[str]:
+	return sorted({name[i:i + 3] for i in range(len(name) - 2)})
+
+def search_fields(name: str, trigrams: bool) -> dict:
+	"""Denormalized fields the name search indexes, kept next to `name` on info/creators documents"""
+	name_lower = normalize_name(name)
+	fields = {"name_lower": name_lower}
+	if trigrams:
+		fields["name_trigrams"] = name_trigrams(name_lower)
+	return fields
+
+def fingerprint(document: dict) -> int:
+	return hash(tuple(sorted(document.items())))
+
+def transactions_unsupported(error: Exception) -> bool:
+	"""Whether an error means the deployment can't run transactions (e.g. a standalone server)"""
+	return isinstance(error, ConfigurationError) or getattr(error, "code", None) == 20 or "Transaction numbers" in str(error)
+
+class WriteBatch:
+	"""One poll cycle's writes, applied together by SendDB.commit"""
+
+	def __init__(self, sends: list[dict] = None, rates: list[dict] = None, info: list[dict] = None, creators: list[dict] = None):
+		self.sends = sends or []
+		self.rates = rates or []
+		self.info = info or []
+		self.creators = creators or []
+
 class SendDB:
-	def __init__(self, connection_string: str):
+	def __init__(self, connection_string: str, follow_graph: bool = False):
+		"""
+		Args:
+			connection_string: MongoDB connection string
+			follow_graph: Keep every follow in memory, so follower lookups and follow lists skip the database
+		"""
 		self.client = MongoClient(connection_string, server_api=ServerApi(ServerApiVersion.V1))
+		self.last_rank_refresh: Optional[datetime] = None
+		self.dirty_lock = threading.Lock()
+		self.dirty_levels: set[int] = set()
+		self.dirty_creators: set[int] = set()
+		self.trending_levels: set[int] = set()
+		self.last_trending_hour: Optional[datetime] = None
+		self.info_cache = TTLCache()
+		self.creator_cache = TTLCache()
+		self.level_stats_cache = TTLCache()
+		self.moderator_cache = TTLCache(ttl=5 * 60)
+		self.fingerprints = TTLCache(maxsize=100000, ttl=6 * 60 * 60)
+		self.transactions_supported: Optional[bool] = None
+		self.counters = Counters()
 		self.create_indexes()
+		self.follow_graph: Optional[FollowGraph] = self._load_follow_graph() if follow_graph else None
 
 	def create_indexes(self):
 		follows = self.get_collection("data", "follows")
 		follows.create_index([("user_id", 1), ("type", 1), ("followed_id", 1)], unique=True)
+		follows.create_index([("type", 1), ("followed_id", 1)])
 
 		weights = self.get_collection("data", "user_weights")
 		weights.create_index("user_id", unique=True)
@@ -22,10 +107,32 @@ class SendDB:
 
 		sends = self.get_collection("data", "sends")
 		sends.create_index("levelID")
+		sends.create_index("timestamp")
 
-		level_stats = self.get_collection("data", "level_stats")
-		level_stats.create_index([("send_count", -1)])
-		level_stats.create_index([("trending_score", -1)])
+		sends_hourly = self.get_collection("data", "sends_hourly")
+		sends_hourly.create_index([("levelID", 1), ("hour", 1)], unique=True)
+		sends_hourly.create_index("hour", expireAfterSeconds=(TRENDING_WINDOW_HOURS + 24) * 60 * 60)
+
+		info = self.get_collection("data", "info")
+		info.create_index("creator")
+		info.create_index("name_lower")
+		info.create_index("name_trigrams")
+
+		creators = self.get_collection("data", "creators")
+		creators.create_index("name_lower")
+
+		level_stats_live = self.get_collection("data", LEVEL_STATS_LIVE)
+		level_stats_live.create_index("last_updated")
+		level_stats_live.create_index("rebuilt")
+
+		creator_stats_live = self.get_collection("data", CREATOR_STATS_LIVE)
+		creator_stats_live.create_index("last_updated")
+
+		# published snapshots get these when they're built; this covers ones published before that
+		for view, indexes in VIEW_INDEXES.items():
+			collection = self.get_collection("data", view)
+			for keys in indexes:
+				collection.create_index(keys)
 
 	def get_database(self, db_name: str) -> Database:
 		return self.client[db_name]
@@ -35,61 +142,121 @@ class SendDB:
 		return db[collection_name]
 
 	def add_sends(self, sends: list[dict]):
-		if not sends: return
-
-		sends_collection = self.get_collection("data", "sends")
-		sends_collection.insert_many(sends)
+		self.commit(WriteBatch(sends=sends))
 
 	def add_info(self, info: list[dict]):
-		if not info: return
-
-		info_collection = self.get_collection("data", "info")
-		operations = [
-			UpdateOne(
-				{"_id": item["_id"]},
-				{"$set": item},
-				upsert=True
-			) for item in info
-		]
-		info_collection.bulk_write(operations)
+		self.commit(WriteBatch(info=info))
 
 	def add_creators(self, creators: list[dict]):
-		if not creators: return
-
-		creators_collection = self.get_collection("data", "creators")
-		operations = [
-			UpdateOne(
-				{"_id": creator["_id"]},
-				{"$set": creator},
-				upsert=True
-			) for creator in creators
-		]
-		creators_collection.bulk_write(operations)
+		self.commit(WriteBatch(creators=creators))
 
 	def add_rates(self, rates: list[dict]):
-		if not rates: return
+		self.commit(WriteBatch(rates=rates))
 
-		rates_collection = self.get_collection("data", "rates")
-		operations = [
-			UpdateOne(
-				{"_id": rate["_id"]},
-				{
-					"$setOnInsert": {
-						"timestamp": rate.get("timestamp", datetime.now(UTC))
+	def commit(self, batch: "WriteBatch"):
+		"""
+		Apply a batch with one unordered bulk write per collection, inside a transaction when the deployment
+		supports them. Info and creator upserts identical to what was last written are skipped.
+		"""
+		# the sent and rated pages can repeat levels and creators
+		info = {item["_id"]: item for item in batch.info}.values()
+		creators = {creator["_id"]: creator for creator in batch.creators}.values()
+		info = [item for item in info if self.fingerprints.get(("info", item["_id"])) != fingerprint(item)]
+		creators = [creator for creator in creators if self.fingerprints.get(("creators", creator["_id"])) != fingerprint(creator)]
+
+		level_stats_bumps = self._level_stats_bumps(batch.sends)
+		operations = {
+			"sends": [InsertOne(send) for send in batch.sends],
+			LEVEL_STATS_LIVE: level_stats_bumps,
+			"level_stats": level_stats_bumps, # so send counts show up before the next snapshot
+			"sends_hourly": self._sends_hourly_bumps(batch.sends),
+			"rates": [
+				UpdateOne(
+					{"_id": rate["_id"]},
+					{
+						"$setOnInsert": {
+							"timestamp": rate.get("timestamp", datetime.now(UTC))
+						},
+						"$set": {k: v for k, v in rate.items() if k != "_id" and k != "timestamp"}
 					},
-					"$set": {k: v for k, v in rate.items() if k != "_id" and k != "timestamp"}
-				},
-				upsert=True
-			)
-			for rate in rates
-		]
-		rates_collection.bulk_write(operations, ordered=False)
+					upsert=True
+				)
+				for rate in batch.rates
+			],
+			"info": [
+				UpdateOne(
+					{"_id": item["_id"]},
+					{"$set": item | search_fields(item["name"], True) if "name" in item else item},
+					upsert=True
+				) for item in info
+			],
+			"creators": [
+				UpdateOne(
+					{"_id": creator["_id"]},
+					{"$set": creator | search_fields(creator["name"], False) if "name" in creator else creator},
+					upsert=True
+				) for creator in creators
+			]
+		}
+		operations = {name: ops for name, ops in operations.items() if ops}
+		if not operations:
+			return
+
+		self._write_operations(operations)
+
+		for item in info:
+			self.fingerprints.set(("info", item["_id"]), fingerprint(item))
+		for creator in creators:
+			self.fingerprints.set(("creators", creator["_id"]), fingerprint(creator))
+		if self.follow_graph is not None:
+			self.follow_graph.set_names("level", {item["_id"]: item["name"] for item in info if "name" in item})
+			self.follow_graph.set_names("creator", {creator["_id"]: creator["name"] for creator in creators if "name" in creator})
+
+		level_ids = [send["levelID"] for send in batch.sends] + [rate["_id"] for rate in batch.rates]
+		self.level_stats_cache.invalidate(level_ids)
+		self.info_cache.invalidate(item["_id"] for item in info)
+		self.creator_cache.invalidate(creator["_id"] for creator in creators)
+		self._mark_dirty(level_ids=level_ids, creator_ids=[item["creator"] for item in info if "creator" in item])
+		with self.dirty_lock:
+			self.trending_levels.update(send["levelID"] for send in batch.sends)
+
+	def _load_follow_graph(self) -> FollowGraph:
+		graph = FollowGraph()
+		follows = self.get_collection("data", "follows")
+		for follow in follows.find({}, {"_id": 0, "user_id": 1, "type": 1, "followed_id": 1}):
+			graph.add(follow["user_id"], follow["type"], follow["followed_id"])
+
+		creators = self._fetch_creators(graph.unnamed("creator"))
+		levels = self._fetch_info(graph.unnamed("level"))
+		graph.set_names("creator", {id: creator["name"] for id, creator in creators.items()})
+		graph.set_names("level", {id: level["name"] for id, level in levels.items()})
+		return graph
+
+	def _write_operations(self, operations: dict[str, list]):
+		def write(session=None):
+			for name, ops in operations.items():
+				self.get_collection("data", name).bulk_write(ops, ordered=False, session=session)
+
+		if self.transactions_supported is not False:
+			try:
+				with self.client.start_session() as session:
+					session.with_transaction(write)
+				self.transactions_supported = True
+				return
+			except (ConfigurationError, OperationFailure) as e:
+				if self.transactions_supported or not transactions_unsupported(e):
+					raise
+				self.transactions_supported = False # standalone server, nothing was written
+
+		write()
 
 	def remove_rates(self, ids: list[int]):
 		if not ids: return
 
 		rates_collection = self.get_collection("data", "rates")
 		rates_collection.delete_many({"_id": {"$in": ids}})
+		self.level_stats_cache.invalidate(ids)
+		self._mark_dirty(level_ids=ids)
 
 	def set_mod(self, id: int, timestamp: datetime, mod: int):
 		sends = self.get_collection("data", "sends")
@@ -104,7 +271,40 @@ class SendDB:
 		results = sends.aggregate(pipeline)
 		return {result["_id"]: {"count": result["count"], "latest_timestamp": result["latest_timestamp"]} for result in results}
 
+	@staticmethod
+	def _cached_lookup(cache: TTLCache, ids: list[int], fetch: Callable[[list[int]], dict]) -> dict:
+		"""Serve a batch point lookup from the cache, fetching only the missing ids (misses are cached as well)"""
+		results = {}
+		missing = []
+		for id in ids:
+			value = cache.get(id)
+			if value is MISSING:
+				missing.append(id)
+			elif value is not None:
+				results[id] = dict(value)
+
+		if missing:
+			fetched = fetch(missing)
+			for id in missing:
+				value = fetched.get(id)
+				cache.set(id, value)
+				if value is not None:
+					results[id] = dict(value)
+
+		return results
+
+	def cache_stats(self) -> dict:
+		return {
+			"info": self.info_cache.stats(),
+			"creators": self.creator_cache.stats(),
+			"level_stats": self.level_stats_cache.stats(),
+			"moderators": self.moderator_cache.stats()
+		}
+
 	def get_creators(self, creator_ids: list[int]) -> dict:
+		return self._cached_lookup(self.creator_cache, creator_ids, self._fetch_creators)
+
+	def _fetch_creators(self, creator_ids: list[int]) -> dict:
 		creators = self.get_collection("data", "creators")
 		pipeline = [
 			{"$match": {"_id": {"$in": creator_ids}}},
@@ -114,6 +314,15 @@ class SendDB:
 		return {result["_id"]: {"name": result["name"], "accountID": result["accountID"]} for result in results}
 
 
+	def get_creators_by_names(self, names: list[str]) -> dict:
+		"""Look up known creators by case-insensitive name, keyed by the normalized name"""
+		creators = self.get_collection("data", "creators")
+		results = creators.find(
+			{"name_lower": {"$in": [normalize_name(name) for name in names]}},
+			{"_id": 1, "name": 1, "name_lower": 1, "accountID": 1}
+		)
+		return {result["name_lower"]: {"_id": result["_id"], "name": result["name"], "accountID": result["accountID"]} for result in results}
+
 	def get_creator_info(self, creator_id: int) -> dict:
 		info = self.get_collection("data", "info")
 		sends = self.get_collection("data", "sends")
@@ -168,7 +377,10 @@ class SendDB:
 		]
 		sends_result = list(sends.aggregate(sends_pipeline))
 
-		followers_count = follows.count_documents({"type": "creator", "followed_id": creator_id})
+		if self.follow_graph is not None:
+			followers_count = len(self.follow_graph.followers_of("creator", creator_id))
+		else:
+			followers_count = follows.count_documents({"type": "creator", "followed_id": creator_id})
 
 		return {
 			"userID": creator_id,
@@ -181,6 +393,9 @@ class SendDB:
 		}
 
 	def get_info(self, level_ids: list[int]) -> dict:
+		return self._cached_lookup(self.info_cache, level_ids, self._fetch_info)
+
+	def _fetch_info(self, level_ids: list[int]) -> dict:
 		info = self.get_collection("data", "info")
 		pipeline = [
 			{"$match": {"_id": {"$in": level_ids}}},
@@ -218,39 +433,100 @@ class SendDB:
 		sends = self.get_collection("data", "sends")
 		return sends.find_one(sort=[("timestamp", -1)])
 
-	def add_follow(self, user_id: int, followed_type: str, followed_id: int):
+	def add_follow(self, user_id: int, followed_type: str, followed_id: int, name: Optional[str] = None):
 		follows = self.get_collection("data", "follows")
 		follows.update_one(
 			{"user_id": user_id, "type": followed_type, "followed_id": followed_id},
 			{"$set": {"timestamp": datetime.now(UTC)}},
 			upsert=True
 		)
+		if self.follow_graph is not None:
+			self.follow_graph.add(user_id, followed_type, followed_id, name)
 
 	def remove_follow(self, user_id: int, followed_type: str, followed_id: int):
 		follows = self.get_collection("data", "follows")
 		follows.delete_one({"user_id": user_id, "type": followed_type, "followed_id": followed_id})
+		if self.follow_graph is not None:
+			self.follow_graph.remove(user_id, followed_type, followed_id)
 
 	def get_follows(self, user_id: int) -> list[dict]:
 		follows = self.get_collection("data", "follows")
 		return list(follows.find({"user_id": user_id}))
 
+	def get_named_follows(self, user_id: int) -> dict[str, list[dict]]:
+		"""A user's followed creators and levels as {"creator": [{_id, name}], "level": [...]}, with None for unknown names"""
+		if self.follow_graph is not None:
+			return self.follow_graph.follows_of(user_id)
+
+		follows = self.get_follows(user_id)
+		creator_ids = [f["followed_id"] for f in follows if f["type"] == "creator"]
+		level_ids = [f["followed_id"] for f in follows if f["type"] == "level"]
+		creators, levels = self.get_creators(creator_ids), self.get_info(level_ids)
+		return {
+			"creator": [{"_id": id, "name": creators[id]["name"] if id in creators else None} for id in creator_ids],
+			"level": [{"_id": id, "name": levels[id]["name"] if id in levels else None} for id in level_ids]
+		}
+
 	def get_followers(self, followed_type: str, followed_id: int) -> list[int]:
+		if self.follow_graph is not None:
+			return self.follow_graph.followers_of(followed_type, followed_id)
+
 		follows = self.get_collection("data", "follows")
 		results = follows.find({"type": followed_type, "followed_id": followed_id})
 		return [result["user_id"] for result in results]
 
+	def get_followers_bulk(self, level_ids: list[int], creator_ids: list[int]) -> dict[int, set[int]]:
+		"""
+		Resolve the followers of several levels at once.
+
+		Args:
+			level_ids: Levels to notify about
+			creator_ids: Creator (player ID) of each level in `level_ids`
+
+		Returns:
+			dict: Each follower's user ID to the levels they follow directly or through their creator
+		"""
+		if not level_ids: return {}
+		if self.follow_graph is not None:
+			return self.follow_graph.followers_bulk(level_ids, creator_ids)
+
+		levels_by_creator = {}
+		for level_id, creator_id in zip(level_ids, creator_ids):
+			levels_by_creator.setdefault(creator_id, []).append(level_id)
+
+		follows = self.get_collection("data", "follows")
+		results = follows.find(
+			{"$or": [
+				{"type": "level", "followed_id": {"$in": list(level_ids)}},
+				{"type": "creator", "followed_id": {"$in": list(levels_by_creator)}}
+			]},
+			{"_id": 0, "user_id": 1, "type": 1, "followed_id": 1}
+		)
+
+		followers = {}
+		for result in results:
+			levels = [result["followed_id"]] if result["type"] == "level" else levels_by_creator[result["followed_id"]]
+			followers.setdefault(result["user_id"], set()).update(levels)
+		return followers
+
 	def search_creators(self, query: str) -> list[dict]:
-		query = re.escape(query)
+		query = normalize_name(query)
+		if not query: return []
+
 		creators = self.get_collection("data", "creators")
 		return list(creators.find(
-			{"name": {"$regex": f"^{query}", "$options": "i"}},
+			{"name_lower": {"$regex": f"^{re.escape(query)}"}},
 			{"_id": 1, "name": 1, "accountID": 1}
-		).limit(25))
+		).sort("name_lower", 1).limit(25))
 
 	def search_levels(self, query: str) -> list[dict]:
 		"""
 		Search for levels by name.
 
+		Names starting with the query come first, served by a prefix scan of the name_lower index.
+		Any remaining slots are filled with names containing the query, found through the
+		name_trigrams index (only for queries of 3 or more characters).
+
 		Args:
 			query: The search term to look for in level names
 
@@ -258,13 +534,42 @@ class SendDB:
 			list: A list of matching level dictionaries with id and name
 		"""
 
-		query = re.escape(query)
+		query = normalize_name(query)
+		if not query: return []
 
 		levels = self.get_collection("data", "info")
-		return list(levels.find(
-			{"name": {"$regex": f"{query}", "$options": "i"}},
+		results = list(levels.find(
+			{"name_lower": {"$regex": f"^{re.escape(query)}"}},
 			{"_id": 1, "name": 1}
-		).sort("name", 1).limit(25))
+		).sort("name_lower", 1).limit(25))
+
+		if len(results) < 25 and len(query) >= 3:
+			results += levels.find(
+				{
+					"name_trigrams": {"$all": name_trigrams(query)},
+					"name_lower": {"$regex": re.escape(query)},
+					"_id": {"$nin": [result["_id"] for result in results]}
+				},
+				{"_id": 1, "name": 1}
+			).sort("name_lower", 1).limit(25 - len(results))
+
+		return results
+
+	def backfill_search_fields(self):
+		"""Add the search fields to info/creators documents written before they existed"""
+		for collection_name, trigrams in (("info", True), ("creators", False)):
+			collection = self.get_collection("data", collection_name)
+			cursor = collection.find({"name_lower": {"$exists": False}, "name": {"$type": "string"}}, {"name": 1})
+
+			operations = []
+			for document in cursor:
+				operations.append(UpdateOne({"_id": document["_id"]}, {"$set": search_fields(document["name"], trigrams)}))
+				if len(operations) >= 1000:
+					collection.bulk_write(operations, ordered=False)
+					operations = []
+
+			if operations:
+				collection.bulk_write(operations, ordered=False)
 
 	def get_trending_levels(self, skip: int = 0, limit: int = 10, get_total: bool = False) -> tuple[list[dict], int]:
 		level_stats = self.get_collection("data", "level_stats")
@@ -729,6 +1034,7 @@ class SendDB:
 				}},
 				upsert=True
 			)
+			self.moderator_cache.invalidate([discord_id])
 			return True
 		except Exception as e:
 			print(f"Error adding moderator: {e}")
@@ -740,6 +1046,7 @@ class SendDB:
 
 		try:
 			result = moderators.delete_one({"discord_id": discord_id})
+			self.moderator_cache.invalidate([discord_id])
 			return result.deleted_count > 0
 		except Exception as e:
 			print(f"Error removing moderator: {e}")
@@ -747,8 +1054,13 @@ class SendDB:
 
 	def is_moderator(self, discord_id: int) -> bool:
 		"""Check if a user is a moderator"""
-		moderators = self.get_collection("data", "moderators")
-		return moderators.count_documents({"discord_id": discord_id}) > 0
+		is_mod = self.moderator_cache.get(discord_id)
+		if is_mod is MISSING:
+			moderators = self.get_collection("data", "moderators")
+			is_mod = moderators.count_documents({"discord_id": discord_id}) > 0
+			self.moderator_cache.set(discord_id, is_mod)
+
+		return is_mod
 
 	def get_moderator(self, discord_id: int) -> dict:
 		"""Get moderator info by discord ID"""
@@ -917,95 +1229,277 @@ class SendDB:
 		stats.update_one({"_id": stat}, {"$set": {"value": value}}, upsert=True)
 
 	def increase_stat(self, stat: str, amount: int = 1):
+		"""Buffer an increment; it's written by the next flush_stats"""
+		self.counters.add(stat, amount)
+
+	def increase_stats(self, amounts: dict[str, int | float]):
+		self.counters.add_many(amounts)
+
+	def observe_latency(self, name: str, ms: float):
+		"""Record a latency in the `name` histogram, written by the next flush_stats"""
+		self.counters.observe(name, ms)
+
+	def flush_stats(self):
+		"""Write every buffered stat increment and latency histogram in one bulk write"""
+		pending, histograms = self.counters.drain()
+		operations = [UpdateOne({"_id": stat}, {"$inc": {"value": amount}}, upsert=True) for stat, amount in pending.items()]
+		operations += [UpdateOne({"_id": f"latency_{name}"}, {"$inc": histogram.increments()}, upsert=True) for name, histogram in histograms.items()]
+		if not operations:
+			return
+
 		stats = self.get_collection("data", "stats")
-		stats.update_one({"_id": stat}, {"$inc": {"value": amount}}, upsert=True)
+		try:
+			stats.bulk_write(operations, ordered=False)
+		except Exception:
+			self.counters.restore(pending, histograms)
+			raise
 
 	def get_stat(self, stat: str) -> int:
 		stats = self.get_collection("data", "stats")
-		return stats.find_one({"_id": stat})["value"]
+		result = stats.find_one({"_id": stat})
+		return (result["value"] if result else 0) + self.counters.pending_amount(stat)
 
-	def refresh_materialized_views(self):
-		self._refresh_level_send_counts()
-		self._refresh_creator_stats()
+	def refresh_materialized_views(self, force: bool = False):
+		full = force or self.last_rank_refresh is None
+		if full:
+			self._rebuild_level_send_counts()
+			self._rebuild_sends_hourly()
+			self.last_trending_hour = None
+
+		now = datetime.now(UTC)
+		ranked = full or now - self.last_rank_refresh >= RANK_REFRESH_INTERVAL
+
+		# a snapshot is published right after, so there's nothing to sync
+		trending_time = self._refresh_level_trending(sync=not ranked)
+		self._refresh_creator_stats(trending_time, full, sync=not ranked)
+
+		if ranked:
+			self._refresh_level_ranks()
+			self._refresh_creator_ranks()
+			self._publish_view("level_stats", LEVEL_STATS_LIVE)
+			self._publish_view("creator_stats", CREATOR_STATS_LIVE)
+			self.last_rank_refresh = now
+
+		self.level_stats_cache.clear()
+
+	def _publish_view(self, view: str, live: str):
+		"""
+		Copy a live view into a new versioned collection, index it, and rename it over the published one.
+		The rename swaps it in atomically, so readers only ever see a complete, fully indexed snapshot.
+		Send bumps committed while the copy runs miss the new snapshot and show up again with the next one.
+		"""
+		database = self.get_database("data")
+		versions = database["view_versions"]
+		version = versions.find_one_and_update({"_id": view}, {"$inc": {"version": 1}}, upsert=True, return_document=ReturnDocument.AFTER)["version"]
+		staging = f"{view}_v{version}"
+
+		self._collect_view_versions(view)
+		database[live].aggregate([{"$out": staging}], allowDiskUse=True)
+		if not database.list_collection_names(filter={"name": staging}): # nothing to copy
+			database.create_collection(staging)
+
+		for keys in VIEW_INDEXES[view]:
+			database[staging].create_index(keys)
+
+		database[staging].rename(view, dropTarget=True)
+		versions.update_one({"_id": view}, {"$set": {"published_version": version, "published_at": datetime.now(UTC)}})
+
+	def _sync_view(self, view: str, live: str, match: dict, fields: list[str], insert: bool = False):
+		"""Copy fields of the matching live documents to the published view"""
+		self.get_collection("data", live).aggregate([
+			{"$match": match},
+			{"$project": {field: 1 for field in fields}},
+			{
+				"$merge": {
+					"into": view,
+					"whenMatched": "merge",
+					"whenNotMatched": "insert" if insert else "discard"
+				}
+			}
+		], allowDiskUse=True)
+
+	def _collect_view_versions(self, view: str):
+		"""Drop staging collections left behind by builds that never got published"""
+		database = self.get_database("data")
+		for name in database.list_collection_names(filter={"name": {"$regex": f"^{view}_v[0-9]+$"}}):
+			database.drop_collection(name)
+
+	@staticmethod
+	def _level_stats_bumps(sends: list[dict]) -> list[UpdateOne]:
+		"""Operations applying new sends to level_stats straight away instead of waiting for the next refresh"""
+		bumps = {}
+		for send in sends:
+			count, latest = bumps.get(send["levelID"], (0, send["timestamp"]))
+			bumps[send["levelID"]] = (count + 1, max(latest, send["timestamp"]))
 
-	def _get_trending_aggregation_stages(self, current_time, group_by: str) -> list[dict]:
-		thirty_days_ago = current_time - timedelta(days=30)
 		return [
-			{"$match": {"timestamp": {"$gte": thirty_days_ago}}},
+			UpdateOne(
+				{"_id": level_id},
+				{
+					"$inc": {"send_count": count},
+					"$max": {"latest_send": latest},
+					"$setOnInsert": {"trending_score": 0.0, "recent_sends": 0}
+				},
+				upsert=True
+			)
+			for level_id, (count, latest) in bumps.items()
+		]
+
+	def _rebuild_level_send_counts(self):
+		"""Recount send_count/latest_send for every level from the full sends history, dropping levels with no sends left"""
+		sends = self.get_collection("data", "sends")
+		rebuilt = datetime.now(UTC)
+
+		pipeline = [
 			{
-				"$addFields": {
-					"age_hours": {
-						"$divide": [
-							{"$subtract": [current_time, "$timestamp"]},
-							1000 * 60 * 60
-						]
-					}
+				"$group": {
+					"_id": "$levelID",
+					"send_count": {"$sum": 1},
+					"latest_send": {"$max": "$timestamp"}
 				}
 			},
+			{"$set": {"trending_score": 0.0, "recent_sends": 0, "rebuilt": rebuilt}},
 			{
-				"$group": {
-					"_id": group_by,
-					"trending_score": {
-						"$sum": {
-							"$divide": [
-								25000,
-								{"$pow": [
-									{"$add": [{"$divide": ["$age_hours", 24]}, 2]},
-									1
-								]}
-							]
-						}
-					},
-					"recent_sends": {"$sum": 1}
+				"$merge": {
+					"into": LEVEL_STATS_LIVE,
+					"whenMatched": [{"$set": {"send_count": "$$new.send_count", "latest_send": "$$new.latest_send", "rebuilt": "$$new.rebuilt"}}],
+					"whenNotMatched": "insert"
 				}
 			}
 		]
 
-	def _refresh_level_send_counts(self):
+		sends.aggregate(pipeline, allowDiskUse=True)
+
+		# documents first inserted by a bump during the rebuild have no stamp and are kept
+		self.get_collection("data", LEVEL_STATS_LIVE).delete_many({"rebuilt": {"$lt": rebuilt}})
+
+	@staticmethod
+	def _sends_hourly_bumps(sends: list[dict]) -> list[UpdateOne]:
+		buckets = Counter((send["levelID"], hour_bucket(send["timestamp"])) for send in sends)
+		return [
+			UpdateOne(
+				{"levelID": level_id, "hour": hour},
+				{"$inc": {"count": count}},
+				upsert=True
+			)
+			for (level_id, hour), count in buckets.items()
+		]
+
+	def _rebuild_sends_hourly(self):
+		"""Rebuild the hourly send buckets inside the trending window from the raw sends"""
 		sends = self.get_collection("data", "sends")
 
-		current_time = datetime.now(UTC)
+		window_start = hour_bucket(datetime.now(UTC)) - timedelta(hours=TRENDING_WINDOW_HOURS - 1)
 
 		pipeline = [
+			{"$match": {"timestamp": {"$gte": window_start}}},
 			{
-				"$facet": {
-					"all_time": [
-						{
-							"$group": {
-								"_id": "$levelID",
-								"send_count": {"$sum": 1},
-								"latest_send": {"$max": "$timestamp"}
-							}
-						}
-					],
-					"trending": self._get_trending_aggregation_stages(current_time, "$levelID")
+				"$group": {
+					"_id": {
+						"levelID": "$levelID",
+						"hour": {"$dateTrunc": {"date": "$timestamp", "unit": "hour"}}
+					},
+					"count": {"$sum": 1}
 				}
 			},
+			{"$project": {"_id": 0, "levelID": "$_id.levelID", "hour": "$_id.hour", "count": 1}},
 			{
-				"$project": {
-					"combined": {
-						"$concatArrays": ["$all_time", "$trending"]
+				"$merge": {
+					"into": "sends_hourly",
+					"on": ["levelID", "hour"],
+					"whenMatched": "replace",
+					"whenNotMatched": "insert"
+				}
+			}
+		]
+
+		sends.aggregate(pipeline, allowDiskUse=True)
+
+	def _refresh_level_trending(self, sync: bool = True) -> Optional[datetime]:
+		"""
+		Rescore trending levels from the hourly send buckets.
+
+		Within the same hour only levels that received sends since the last run can change score,
+		so only those are rescored. Once the hour rolls over every level in the window decays and
+		all of them are rescored.
+
+		Args:
+			sync: Also write the new scores to the published level_stats
+
+		Returns:
+			datetime: The last_updated value written to rescored levels, or None if nothing changed
+		"""
+		sends_hourly = self.get_collection("data", "sends_hourly")
+		level_stats = self.get_collection("data", LEVEL_STATS_LIVE)
+
+		current_time = datetime.now(UTC)
+		current_hour = hour_bucket(current_time)
+
+		with self.dirty_lock:
+			trending_levels, self.trending_levels = self.trending_levels, set()
+
+		hour_rolled = current_hour != self.last_trending_hour
+		if not hour_rolled and not trending_levels:
+			return None
+
+		match = {"hour": {"$gt": current_hour - timedelta(hours=TRENDING_WINDOW_HOURS)}}
+		if not hour_rolled:
+			match["levelID"] = {"$in": list(trending_levels)}
+
+		pipeline = [
+			{"$match": match},
+			{
+				"$set": {
+					"weight": {
+						"$arrayElemAt": [
+							TRENDING_WEIGHTS,
+							# buckets ahead of this host's clock count as the current hour instead of indexing from the end
+							{"$max": [0, {"$toInt": {"$divide": [{"$subtract": [current_hour, "$hour"]}, 1000 * 60 * 60]}}]}
+						]
 					}
 				}
 			},
-			{"$unwind": "$combined"},
-			{"$replaceRoot": {"newRoot": "$combined"}},
 			{
 				"$group": {
-					"_id": "$_id",
-					"send_count": {"$max": "$send_count"},
-					"latest_send": {"$max": "$latest_send"},
-					"trending_score": {"$max": "$trending_score"},
-					"recent_sends": {"$max": "$recent_sends"}
+					"_id": "$levelID",
+					"trending_score": {"$sum": {"$multiply": ["$count", "$weight"]}},
+					"recent_sends": {"$sum": "$count"}
 				}
 			},
+			{"$set": {"last_updated": current_time}},
 			{
-				"$set": {
-					"last_updated": current_time,
-					"trending_score": {"$ifNull": ["$trending_score", 0.0]},
-					"recent_sends": {"$ifNull": ["$recent_sends", 0]}
+				"$merge": {
+					"into": LEVEL_STATS_LIVE,
+					"whenMatched": "merge",
+					"whenNotMatched": "discard"
 				}
-			},
+			}
+		]
+
+		try:
+			sends_hourly.aggregate(pipeline, allowDiskUse=True)
+
+			if hour_rolled:
+				# Levels whose last send left the window weren't touched by the merge above
+				level_stats.update_many(
+					{"trending_score": {"$gt": 0}, "last_updated": {"$lt": current_time}},
+					{"$set": {"trending_score": 0.0, "recent_sends": 0, "last_updated": current_time}}
+				)
+
+			if sync:
+				self._sync_view("level_stats", LEVEL_STATS_LIVE, {"last_updated": current_time}, ["trending_score", "recent_sends", "last_updated"])
+		except Exception:
+			with self.dirty_lock:
+				self.trending_levels |= trending_levels # retried on the next refresh
+			raise
+
+		self.last_trending_hour = current_hour
+		return current_time
+
+	def _refresh_level_ranks(self):
+		level_stats = self.get_collection("data", LEVEL_STATS_LIVE)
+
+		pipeline = [
 			{
 				"$lookup": {
 					"from": "rates",
@@ -1023,10 +1517,22 @@ class SendDB:
 				}
 			},
 			{"$unwind": "$info"},
+			{
+				"$lookup": {
+					"from": "creators",
+					"localField": "info.creator",
+					"foreignField": "_id",
+					"as": "creator_info"
+				}
+			},
 			{
 				"$addFields": {
 					"has_rate": {"$gt": [{"$size": "$rate"}, 0]},
 					"platformer": "$info.platformer",
+					"name": "$info.name",
+					"creator": "$info.creator",
+					"creator_name": {"$ifNull": [{"$arrayElemAt": ["$creator_info.name", 0]}, "Unknown"]},
+					"creator_account_id": {"$ifNull": [{"$arrayElemAt": ["$creator_info.accountID", 0]}, 0]},
 					"sort_key_send": {"score": "$send_count", "tiebreak": {"$multiply": ["$_id", -1]}},
 					"sort_key_trending": {"score": "$trending_score", "tiebreak": {"$multiply": ["$_id", -1]}}
 				}
@@ -1082,11 +1588,12 @@ class SendDB:
 			{
 				"$project": {
 					"_id": 1,
-					"send_count": 1,
-					"latest_send": 1,
-					"trending_score": 1,
-					"recent_sends": 1,
-					"last_updated": 1,
+					"has_rate": 1,
+					"platformer": 1,
+					"name": 1,
+					"creator": 1,
+					"creator_name": 1,
+					"creator_account_id": 1,
 					"rank": 1,
 					"rate_rank": 1,
 					"gamemode_rank": 1,
@@ -1096,81 +1603,99 @@ class SendDB:
 			},
 			{
 				"$merge": {
-					"into": "level_stats",
-					"whenMatched": "replace",
-					"whenNotMatched": "insert"
+					"into": LEVEL_STATS_LIVE,
+					"whenMatched": "merge",
+					"whenNotMatched": "discard"
 				}
 			}
 		]
 
-		sends.aggregate(pipeline, allowDiskUse=True)
+		level_stats.aggregate(pipeline, allowDiskUse=True)
 
-	def _refresh_creator_stats(self):
+	def _mark_dirty(self, level_ids: list[int] = (), creator_ids: list[int] = ()):
+		"""Queue levels/creators whose creator_stats need recomputing on the next refresh"""
+		with self.dirty_lock:
+			self.dirty_levels.update(level_ids)
+			self.dirty_creators.update(creator_ids)
+
+	def _refresh_creator_stats(self, trending_time: Optional[datetime], full: bool = False, sync: bool = True):
+		"""Recompute creator_stats for dirty creators (or all of them), also writing them to the published view if `sync` is set"""
+		with self.dirty_lock:
+			dirty_levels, self.dirty_levels = self.dirty_levels, set()
+			dirty_creators, self.dirty_creators = self.dirty_creators, set()
+
+		try:
+			self._aggregate_creator_stats(dirty_levels, dirty_creators, trending_time, full, sync)
+		except Exception:
+			self._mark_dirty(dirty_levels, dirty_creators) # retried on the next refresh
+			raise
+
+	def _aggregate_creator_stats(self, dirty_levels: set[int], dirty_creators: set[int], trending_time: Optional[datetime], full: bool, sync: bool):
 		info = self.get_collection("data", "info")
+		level_stats = self.get_collection("data", LEVEL_STATS_LIVE)
+
+		if full:
+			match = {}
+		else:
+			# Levels rescored by the last trending pass count as dirty too
+			if trending_time is not None:
+				dirty_levels.update(level_stats.distinct("_id", {"last_updated": trending_time}))
+			if dirty_levels:
+				dirty_creators.update(info.distinct("creator", {"_id": {"$in": list(dirty_levels)}}))
+
+			if not dirty_creators:
+				return
+
+			match = {"creator": {"$in": list(dirty_creators)}}
 
 		current_time = datetime.now(UTC)
 
 		pipeline = [
+			{"$match": match},
 			{
 				"$lookup": {
-					"from": "sends",
+					"from": LEVEL_STATS_LIVE,
 					"localField": "_id",
-					"foreignField": "levelID",
-					"as": "sends"
+					"foreignField": "_id",
+					"as": "stats"
+				}
+			},
+			{
+				"$lookup": {
+					"from": "rates",
+					"localField": "_id",
+					"foreignField": "_id",
+					"as": "rate"
+				}
+			},
+			{
+				"$set": {
+					"stats": {"$arrayElemAt": ["$stats", 0]},
+					"has_rate": {"$gt": [{"$size": "$rate"}, 0]}
 				}
 			},
 			{
 				"$set": {
-					"send_count_per_level": {"$size": "$sends"}
+					"send_count_per_level": {"$ifNull": ["$stats.send_count", 0]},
+					"trending_score_per_level": {"$cond": ["$has_rate", 0, {"$ifNull": ["$stats.trending_score", 0]}]},
+					"recent_sends_per_level": {"$cond": ["$has_rate", 0, {"$ifNull": ["$stats.recent_sends", 0]}]}
 				}
 			},
 			{
 				"$group": {
 					"_id": "$creator",
-					"level_ids": {"$push": "$_id"},
 					"level_count": {"$sum": 1},
+					"sent_level_count": {"$sum": {"$cond": [{"$gt": ["$send_count_per_level", 0]}, 1, 0]}},
 					"send_count": {"$sum": "$send_count_per_level"},
 					"send_counts": {"$push": "$send_count_per_level"},
-					"latest_send": {"$max": {"$max": "$sends.timestamp"}}
-				}
-			},
-			{
-				"$lookup": {
-					"from": "sends",
-					"let": {"creator_level_ids": "$level_ids"},
-					"pipeline": [
-						{"$match": {"$expr": {"$in": ["$levelID", "$$creator_level_ids"]}}},
-						*self._get_trending_aggregation_stages(current_time, "$levelID"),
-						{
-							"$lookup": {
-								"from": "rates",
-								"localField": "_id",
-								"foreignField": "_id",
-								"as": "rate"
-							}
-						},
-						{
-							"$match": {
-								"rate": {"$size": 0}
-							}
-						},
-						{
-							"$group": {
-								"_id": None,
-								"trending_score": {"$sum": "$trending_score"},
-								"recent_sends": {"$sum": "$recent_sends"},
-								"trending_level_count": {"$sum": 1}
-							}
-						}
-					],
-					"as": "trending_data"
+					"latest_send": {"$max": "$stats.latest_send"},
+					"trending_score": {"$sum": "$trending_score_per_level"},
+					"recent_sends": {"$sum": "$recent_sends_per_level"},
+					"trending_level_count": {"$sum": {"$cond": [{"$gt": ["$recent_sends_per_level", 0]}, 1, 0]}}
 				}
 			},
 			{
 				"$set": {
-					"trending_score": {"$ifNull": [{"$arrayElemAt": ["$trending_data.trending_score", 0]}, 0]},
-					"recent_sends": {"$ifNull": [{"$arrayElemAt": ["$trending_data.recent_sends", 0]}, 0]},
-					"trending_level_count": {"$ifNull": [{"$arrayElemAt": ["$trending_data.trending_level_count", 0]}, 0]},
 					"send_count_stddev": {"$stdDevPop": "$send_counts"},
 					"send_count_avg": {"$avg": "$send_counts"},
 					"last_updated": current_time
@@ -1187,9 +1712,53 @@ class SendDB:
 			{"$unwind": "$creator_info"},
 			{
 				"$set": {
+					"name": "$creator_info.name",
 					"account_id": "$creator_info.accountID"
 				}
 			},
+			{
+				"$project": {
+					"_id": 1,
+					"name": 1,
+					"account_id": 1,
+					"level_count": 1,
+					"sent_level_count": 1,
+					"send_count": 1,
+					"latest_send": 1,
+					"trending_score": 1,
+					"trending_level_count": 1,
+					"recent_sends": 1,
+					"send_count_stddev": 1,
+					"send_count_avg": 1,
+					"last_updated": 1
+				}
+			},
+			{
+				"$merge": {
+					"into": CREATOR_STATS_LIVE,
+					"whenMatched": "merge",
+					"whenNotMatched": "insert"
+				}
+			}
+		]
+
+		info.aggregate(pipeline, allowDiskUse=True)
+
+		if full:
+			# creators left without levels weren't part of the full pass
+			self.get_collection("data", CREATOR_STATS_LIVE).delete_many({"last_updated": {"$lt": current_time}})
+
+		if sync:
+			self._sync_view(
+				"creator_stats", CREATOR_STATS_LIVE, {"last_updated": current_time},
+				["name", "account_id", "level_count", "sent_level_count", "send_count", "latest_send", "trending_score", "trending_level_count", "recent_sends", "send_count_stddev", "send_count_avg", "last_updated"],
+				insert=True
+			)
+
+	def _refresh_creator_ranks(self):
+		creator_stats = self.get_collection("data", CREATOR_STATS_LIVE)
+
+		pipeline = [
 			{
 				"$addFields": {
 					"sort_key_send": {"score": "$send_count", "tiebreak": {"$multiply": ["$_id", -1]}},
@@ -1211,55 +1780,182 @@ class SendDB:
 			{
 				"$project": {
 					"_id": 1,
-					"account_id": 1,
-					"level_count": 1,
-					"send_count": 1,
-					"latest_send": 1,
-					"trending_score": 1,
-					"trending_level_count": 1,
-					"recent_sends": 1,
-					"send_count_stddev": 1,
-					"send_count_avg": 1,
-					"last_updated": 1,
-					"rank": 1,
+					# like the leaderboard this replaced, only creators with sent levels are ranked; the sort puts them first
+					"rank": {"$cond": [{"$gt": ["$send_count", 0]}, "$rank", None]},
 					"trending_rank": 1
 				}
 			},
 			{
 				"$merge": {
-					"into": "creator_stats",
-					"whenMatched": "replace",
-					"whenNotMatched": "insert"
+					"into": CREATOR_STATS_LIVE,
+					"whenMatched": "merge",
+					"whenNotMatched": "discard"
 				}
 			}
 		]
 
-		info.aggregate(pipeline, allowDiskUse=True)
+		creator_stats.aggregate(pipeline, allowDiskUse=True)
+
+	@staticmethod
+	def _level_rank_filter(rated: Optional[bool], platformer: Optional[bool]) -> tuple[str, dict]:
+		"""Pick the precomputed rank field, and the partition it ranks within, for a leaderboard filter"""
+		query = {}
+		if rated is not None:
+			query["has_rate"] = rated
+		if platformer is not None:
+			query["platformer"] = platformer
+
+		if rated is not None and platformer is not None:
+			return "joined_rank", query
+		if rated is not None:
+			return "rate_rank", query
+		if platformer is not None:
+			return "gamemode_rank", query
+		return "rank", query
+
+	def get_level_leaderboard(self, skip: int = 0, limit: int = 10, rated: Optional[bool] = None, platformer: Optional[bool] = None) -> tuple[list[dict], int]:
+		"""
+		Get a page of the level send leaderboard from the ranks stored by the last view refresh.
+
+		Ranks are contiguous within each partition, so a page is a single index range scan and the
+		total is the highest rank in the partition.
+
+		Args:
+			skip: Number of entries before the page
+			limit: Page size
+			rated: Only rated (True) or unrated (False) levels, or both if None
+			platformer: Only platformer (True) or classic (False) levels, or both if None
+
+		Returns:
+			tuple: (list of leaderboard entries, total count)
+		"""
+		level_stats = self.get_collection("data", "level_stats")
+		rank_field, query = self._level_rank_filter(rated, platformer)
+
+		last = level_stats.find_one(query, {rank_field: 1}, sort=[(rank_field, -1)])
+		if not last or not last.get(rank_field):
+			return [], 0
+
+		results = level_stats.find(
+			query | {rank_field: {"$gt": skip, "$lte": skip + limit}},
+			{"name": 1, "creator_name": 1, "creator_account_id": 1, "send_count": 1, rank_field: 1}
+		).sort(rank_field, 1)
+
+		return [
+			{
+				"levelID": result["_id"],
+				"name": result["name"],
+				"creator": result["creator_name"],
+				"creatorID": result["creator_account_id"],
+				"sends": result["send_count"],
+				"rank": result[rank_field]
+			}
+			for result in results
+		], last[rank_field]
+
+	def get_creator_leaderboard(self, skip: int = 0, limit: int = 10) -> tuple[list[dict], int]:
+		"""Get a page of the creator send leaderboard from the ranks stored by the last view refresh"""
+		creator_stats = self.get_collection("data", "creator_stats")
+
+		last = creator_stats.find_one({}, {"rank": 1}, sort=[("rank", -1)])
+		if not last or not last.get("rank"):
+			return [], 0
+
+		results = creator_stats.find(
+			{"rank": {"$gt": skip, "$lte": skip + limit}},
+			{"name": 1, "account_id": 1, "send_count": 1, "sent_level_count": 1, "rank": 1}
+		).sort("rank", 1)
+
+		return [
+			{
+				"_id": result["_id"],
+				"name": result["name"],
+				"accountID": result["account_id"],
+				"sends": result["send_count"],
+				"level_count": result["sent_level_count"], # levels with sends, as the leaderboard always counted
+				"rank": result["rank"]
+			}
+			for result in results
+		], last["rank"]
+
+	def get_level_position(self, level_id: int, rated: Optional[bool] = None, platformer: Optional[bool] = None) -> Optional[int]:
+		"""
+		Find a level's 0-indexed position on the (filtered) level send leaderboard.
+
+		Reads the stored rank for the level. Levels sent for the first time since the last rank pass
+		aren't on the leaderboard pages yet, so they have no position either.
+
+		Returns:
+			int: The position, or None if the level isn't on the leaderboard
+		"""
+		level_stats = self.get_collection("data", "level_stats")
+		rank_field, query = self._level_rank_filter(rated, platformer)
+
+		stats = level_stats.find_one({"_id": level_id}, [rank_field, *query])
+		if not stats or not stats.get(rank_field) or any(stats.get(key) != value for key, value in query.items()):
+			return None
+
+		return stats[rank_field] - 1
+
+	def get_creator_position(self, creator_id: int) -> Optional[int]:
+		"""Find a creator's 0-indexed position on the creator send leaderboard, or None if they aren't ranked on it yet"""
+		creator_stats = self.get_collection("data", "creator_stats")
+
+		stats = creator_stats.find_one({"_id": creator_id}, ["rank"])
+		if not stats or not stats.get("rank"):
+			return None
+
+		return stats["rank"] - 1
 
 	def get_level_stats(self, level_ids: list[int]) -> dict:
+		return self._cached_lookup(self.level_stats_cache, level_ids, self._fetch_level_stats)
+
+	def _fetch_level_stats(self, level_ids: list[int]) -> dict:
 		level_stats = self.get_collection("data", "level_stats")
 		results = level_stats.find({"_id": {"$in": level_ids}})
 		return {
 			result["_id"]: {
 				"count": result["send_count"],
 				"latest_timestamp": result["latest_send"],
-				"rank": result["rank"],
+				"rank": result.get("rank", 0),
 				"trending_score": result.get("trending_score", 0),
 				"recent_sends": result.get("recent_sends", 0)
 			}
 			for result in results
 		}
 
-	def get_creator_stats_from_view(self, creator_id: int) -> dict:
-		creator_stats = self.get_collection("data", "creator_stats")
-		stats = creator_stats.find_one({"_id": creator_id})
+class AsyncSendDB:
+	"""
+	Async facade over SendDB for use on the bot's event loop.
 
-		if not stats:
-			return None
+	Every SendDB method is exposed under the same name as a coroutine that runs the
+	blocking pymongo call on a bounded thread pool, so slow aggregations never stall
+	the gateway heartbeat or other interactions. Methods that only touch memory run
+	inline instead of queueing behind them.
+	"""
 
-		return {
-			"send_count": stats["send_count"],
-			"level_count": stats["level_count"],
-			"latest_send": stats["latest_send"],
-			"rank": stats["rank"]
-		}
\ No newline at end of file
+	INLINE = {"increase_stat", "increase_stats", "observe_latency", "cache_stats"}
+
+	def __init__(self, db: SendDB, max_workers: int = 8):
+		self.sync = db
+		self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="senddb")
+
+	def __getattr__(self, name: str):
+		attr = getattr(self.sync, name)
+		if not callable(attr):
+			return attr
+
+		async def call(*args, **kwargs):
+			if name in self.INLINE:
+				return attr(*args, **kwargs)
+			return await self.run(attr, *args, **kwargs)
+
+		call.__name__ = name
+		return call
+
+	async def run(self, func: Callable, *args, **kwargs):
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+	def close(self):
+		self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,109 @@
+from typing import Optional
+
+RATE_CACHE_POLLS = 2 # counted in polls rather than seconds, so slow or backed off polling can't outlast it
+
+class SendDetector:
+	"""
+	Works out which levels were sent and rated between two polls of the sent (type 27) and rated (type 11)
+	level lists.
+
+	A send bumps a level to the top of the sent list, so every level that moved up compared to the previous
+	poll (or is new) marks how far down the list the bumps reach. Newly rated levels disappear from the sent
+	list, which shifts the levels below them up, so they're ignored for the next `rate_cache_polls` polls.
+
+	Every step uses sets and position maps, so a poll costs O(n) in the length of the lists.
+
+	A poll may cover more pages than the previous one when a burst overflowed the first page. Levels on the
+	extra pages that were never seen before are only counted as sends above the lowest level that kept its
+	place, since everything below that is just older sends that were already off the previous page.
+	"""
+
+	def __init__(
+		self,
+		previous_levels: Optional[list[int]] = None,
+		previous_rated_levels: Optional[list[int]] = None,
+		rate_cache: Optional[dict[int, int]] = None,
+		polls: int = 0,
+		rate_cache_polls: int = RATE_CACHE_POLLS
+	):
+		self.previous_levels = previous_levels or []
+		self.previous_rated_levels = previous_rated_levels or []
+		self.rate_cache = rate_cache if rate_cache is not None else {}
+		self.polls = polls
+		self.rate_cache_polls = rate_cache_polls
+
+	def update(self, levels: list[int], rated_levels: list[int]) -> tuple[list[int], list[int]]:
+		"""
+		Compare a poll against the previous one and remember it for the next.
+
+		Returns:
+			tuple: The sent level IDs (oldest send first) and the newly rated level IDs
+		"""
+		rated = set(rated_levels)
+		filtered_levels = [level for level in levels if level not in rated]
+		self.polls += 1
+
+		if not self.previous_levels:
+			self.previous_levels = levels.copy()
+			self.previous_rated_levels = rated_levels.copy()
+			return filtered_levels, rated_levels.copy()
+
+		previous_rated = set(self.previous_rated_levels)
+		rates = [level for level in rated_levels if level not in previous_rated]
+		for level in rates:
+			self.rate_cache[level] = self.polls
+
+		expired_levels = [level for level, poll in self.rate_cache.items() if self.polls - poll > self.rate_cache_polls]
+		for level in expired_levels:
+			del self.rate_cache[level]
+
+		# positions in the previous list once the first occurrence of every recently rated level is removed
+		ignored = set()
+		previous_positions = {}
+		position = 0
+		for level in self.previous_levels:
+			if level in self.rate_cache and level not in ignored:
+				ignored.add(level)
+				continue
+			previous_positions.setdefault(level, position)
+			position += 1
+
+		check_limit = len(filtered_levels) - len(ignored)
+		if len(levels) > len(self.previous_levels):
+			check_limit = min(check_limit, self.horizon(filtered_levels, previous_positions))
+		max_bumps = 0
+
+		for i in range(check_limit):
+			if i < previous_positions.get(filtered_levels[i], float('inf')):
+				max_bumps = i + 1
+
+		sends = filtered_levels[:max_bumps]
+		sends.reverse()
+
+		self.previous_levels = levels.copy()
+		self.previous_rated_levels = rated_levels.copy()
+
+		return sends, rates
+
+	@staticmethod
+	def horizon(levels: list[int], previous_positions: dict[int, int]) -> int:
+		"""Number of leading levels that can contain sends: up to the lowest previously seen level that wasn't bumped"""
+		for i in range(len(levels) - 1, -1, -1):
+			position = previous_positions.get(levels[i])
+			if position is not None and i >= position:
+				return i + 1
+
+		return len(levels)
+
+	def overflowed(self, levels: list[int], rated_levels: list[int]) -> bool:
+		"""Whether every level on the page moved up or is new, so sends may have been pushed off it"""
+		if not self.previous_levels:
+			return False
+
+		rated = set(rated_levels)
+		previous_positions = {}
+		for position, level in enumerate(self.previous_levels):
+			previous_positions.setdefault(level, position)
+
+		filtered_levels = [level for level in levels if level not in rated]
+		return all(i < previous_positions.get(level, float('inf')) for i, level in enumerate(filtered_levels))
@@ -0,0 +1,192 @@
+import asyncio, logging, time
+from typing import Iterable, Optional
+
+import aiohttp, discord
+
+from cache import TTLCache, MISSING
+from metrics import Counters, Histogram
+from state import StateStore
+from utils import MAX_EMBEDS
+
+def transient(error: Exception) -> bool:
+	"""Whether a failed send is worth retrying: server errors, ratelimits, network errors and timeouts"""
+	if isinstance(error, discord.HTTPException):
+		return error.status >= 500 or error.status == 429
+	return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+class DMDispatcher:
+	"""
+	Delivers follower notifications by DM from a small pool of workers.
+
+	Notifications for the same user that arrive within `batch_window` seconds are sent as one message (up to
+	ten embeds each). Users are cached, so their DM channel is only opened once, and the pool is small enough
+	that discord.py's per-route rate limit handling never has a large backlog to sleep through. Deliveries
+	that fail for transient reasons go to a retry queue saved in `store`, with exponential backoff.
+	"""
+
+	def __init__(
+		self,
+		client: discord.Client,
+		store: StateStore,
+		counters: Optional[Counters] = None,
+		workers: int = 4,
+		batch_window: float = 2,
+		max_attempts: int = 5,
+		retry_delay: float = 30
+	):
+		self.client = client
+		self.store = store
+		self.counters = counters or Counters()
+		self.workers = workers
+		self.batch_window = batch_window
+		self.max_attempts = max_attempts
+		self.retry_delay = retry_delay
+		self.users = TTLCache(maxsize=10000, ttl=60 * 60)
+		self.pending: dict[int, list[tuple[dict, float]]] = {}
+		self.ready: asyncio.Queue[tuple[int, list[tuple[dict, float]], int]] = asyncio.Queue()
+		self.retries: list[dict] = []
+		self.queued = 0 # notifications in `ready`
+		self.latency = Histogram()
+		self.tasks: list[asyncio.Task] = []
+
+	def start(self):
+		if self.tasks:
+			return
+
+		self.retries = self.store.load().get("retries", [])
+		self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+		self.tasks.append(asyncio.create_task(self.retry_worker()))
+
+	async def stop(self):
+		"""Stop the workers, keeping anything undelivered in the retry queue"""
+		for task in self.tasks:
+			task.cancel()
+		await asyncio.gather(*self.tasks, return_exceptions=True)
+		self.tasks = []
+
+		now = time.time()
+		while not self.ready.empty():
+			user_id, items, attempts = self.ready.get_nowait()
+			self.queued -= len(items)
+			self.retries.append(self.retry_entry(user_id, items, attempts, now))
+		for user_id, items in self.pending.items():
+			self.retries.append(self.retry_entry(user_id, items, 0, now))
+		self.pending.clear()
+
+		await self.save_retries()
+		self.store.close()
+
+	def notify(self, user_ids: Iterable[int], embed: discord.Embed):
+		"""Queue an embed for each user"""
+		item = (embed.to_dict(), time.time())
+		loop = asyncio.get_running_loop()
+		for user_id in user_ids:
+			if user_id not in self.pending:
+				self.pending[user_id] = []
+				loop.call_later(self.batch_window, self.flush_user, user_id)
+			self.pending[user_id].append(item)
+
+	def flush_user(self, user_id: int):
+		items = self.pending.pop(user_id, None)
+		if items:
+			self.enqueue(user_id, items, 0)
+
+	def enqueue(self, user_id: int, items: list[tuple[dict, float]], attempts: int):
+		self.queued += len(items)
+		self.ready.put_nowait((user_id, items, attempts))
+
+	async def worker(self):
+		while True:
+			user_id, items, attempts = await self.ready.get()
+			self.queued -= len(items)
+			try:
+				for i in range(0, len(items), MAX_EMBEDS):
+					chunk = items[i:i + MAX_EMBEDS]
+					try:
+						await self.deliver(user_id, chunk, attempts)
+					except Exception: # anything unexpected only loses this message, never the worker
+						logging.exception(f"Error delivering {len(chunk)} notifications to {user_id}")
+						self.counters.add("dm_failed", len(chunk))
+			finally:
+				self.ready.task_done()
+
+	async def deliver(self, user_id: int, items: list[tuple[dict, float]], attempts: int):
+		try:
+			user = await self.get_user(user_id)
+			await user.send(embeds=[discord.Embed.from_dict(embed) for embed, _ in items])
+		except (discord.NotFound, discord.Forbidden):
+			self.users.invalidate((user_id,))
+			self.counters.add("dm_undeliverable", len(items))
+			return
+		except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+			if not transient(e):
+				logging.warning(f"Dropping {len(items)} notifications for {user_id}: {e}")
+				self.counters.add("dm_failed", len(items))
+				return
+			if attempts + 1 >= self.max_attempts:
+				logging.warning(f"Dropping {len(items)} notifications for {user_id} after {attempts + 1} attempts: {e}")
+				self.counters.add("dm_failed", len(items))
+				return
+
+			self.retries.append(self.retry_entry(user_id, items, attempts + 1, time.time() + self.retry_delay * 2 ** attempts))
+			await self.save_retries()
+			return
+
+		now = time.time()
+		for _, queued in items:
+			ms = (now - queued) * 1000
+			self.latency.observe(ms)
+			self.counters.observe("dm_delivery", ms)
+		self.counters.add("dm_sent", len(items))
+
+	async def retry_worker(self):
+		while True:
+			await asyncio.sleep(5)
+
+			now = time.time()
+			due = [entry for entry in self.retries if entry["due"] <= now]
+			if not due:
+				continue
+
+			self.retries = [entry for entry in self.retries if entry["due"] > now]
+			for entry in due:
+				self.enqueue(entry["user"], [tuple(item) for item in entry["items"]], entry["attempts"])
+			await self.save_retries()
+
+	async def save_retries(self):
+		"""Persist the retry queue; it stays in memory if that fails"""
+		try:
+			await self.store.save(retries=self.retries)
+		except Exception:
+			logging.exception("Error saving the DM retry queue")
+
+	async def get_user(self, user_id: int) -> discord.User:
+		user = self.client.get_user(user_id)
+		if user is not None:
+			return user
+
+		user = self.users.get(user_id)
+		if user is MISSING:
+			user = await self.client.fetch_user(user_id)
+			self.users.set(user_id, user)
+		return user
+
+	@staticmethod
+	def retry_entry(user_id: int, items: list[tuple[dict, float]], attempts: int, due: float) -> dict:
+		return {"user": user_id, "items": [list(item) for item in items], "attempts": attempts, "due": due}
+
+	def queue_depth(self) -> int:
+		"""Notifications waiting to be sent, including ones waiting for a retry"""
+		return (
+			sum(len(items) for items in self.pending.values())
+			+ self.queued
+			+ sum(len(entry["items"]) for entry in self.retries)
+		)
+
+	def stats(self) -> dict:
+		return {
+			"queue_depth": self.queue_depth(),
+			"retries": len(self.retries),
+			"p50_ms": self.latency.percentile(0.5),
+			"p95_ms": self.latency.percentile(0.95)
+		}
@@ -0,0 +1,74 @@
+import threading
+from typing import Iterable, Optional
+
+class FollowGraph:
+	"""
+	Thread-safe in-memory copy of the follows collection, indexed both ways: who follows a level or creator,
+	and what each user follows. It also keeps the names of followed levels and creators so follow lists
+	need no lookups.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.followers: dict[tuple[str, int], set[int]] = {}
+		self.following: dict[int, dict[tuple[str, int], None]] = {} # dicts keep follow order
+		self.names: dict[tuple[str, int], str] = {}
+
+	def add(self, user_id: int, followed_type: str, followed_id: int, name: Optional[str] = None):
+		key = (followed_type, followed_id)
+		with self.lock:
+			self.followers.setdefault(key, set()).add(user_id)
+			self.following.setdefault(user_id, {})[key] = None
+			if name is not None:
+				self.names[key] = name
+
+	def remove(self, user_id: int, followed_type: str, followed_id: int):
+		key = (followed_type, followed_id)
+		with self.lock:
+			users = self.followers.get(key)
+			if users is not None:
+				users.discard(user_id)
+				if not users:
+					del self.followers[key]
+					self.names.pop(key, None)
+
+			follows = self.following.get(user_id)
+			if follows is not None:
+				follows.pop(key, None)
+				if not follows:
+					del self.following[user_id]
+
+	def set_names(self, followed_type: str, names: dict[int, str]):
+		"""Update the names of whichever of these levels or creators are followed"""
+		with self.lock:
+			for followed_id, name in names.items():
+				key = (followed_type, followed_id)
+				if key in self.followers:
+					self.names[key] = name
+
+	def unnamed(self, followed_type: str) -> list[int]:
+		with self.lock:
+			return [followed_id for type, followed_id in self.followers if type == followed_type and (type, followed_id) not in self.names]
+
+	def followers_of(self, followed_type: str, followed_id: int) -> list[int]:
+		with self.lock:
+			return list(self.followers.get((followed_type, followed_id), ()))
+
+	def followers_bulk(self, level_ids: Iterable[int], creator_ids: Iterable[int]) -> dict[int, set[int]]:
+		"""Each follower of the levels, directly or through the creator at the same position, to those levels"""
+		result = {}
+		with self.lock:
+			for level_id, creator_id in zip(level_ids, creator_ids):
+				for user_id in self.followers.get(("level", level_id), ()):
+					result.setdefault(user_id, set()).add(level_id)
+				for user_id in self.followers.get(("creator", creator_id), ()):
+					result.setdefault(user_id, set()).add(level_id)
+		return result
+
+	def follows_of(self, user_id: int) -> dict[str, list[dict]]:
+		"""A user's followed creators and levels with their names, or None where the name is unknown"""
+		result = {"creator": [], "level": []}
+		with self.lock:
+			for key in self.following.get(user_id, ()):
+				result[key[0]].append({"_id": key[1], "name": self.names.get(key)})
+		return result
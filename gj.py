@@ -0,0 +1,158 @@
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+REQUIRED = object()
+
+class Field(NamedTuple):
+	key: str # key of a keyed entry, or the index of a positional one
+	convert: Callable[[str], Any] = str
+	default: Any = REQUIRED
+
+class Schema:
+	"""
+	Describes the entries of one response section, e.g. `1:123:2:Name:6:456` (keyed) or `456:Name:789`
+	(positional), and parses them into dicts with the given field names.
+
+	Consecutive polls of a list repeat most of its entries verbatim, so parsed entries are memoized by their
+	text and only new or changed entries are parsed.
+	"""
+
+	def __init__(
+		self,
+		fields: dict[str, Field],
+		positional: bool = False,
+		separator: str = ":",
+		entry_separator: str = "|",
+		memo_size: int = 512
+	):
+		self.fields = fields
+		self.positional = positional
+		self.separator = separator
+		self.entry_separator = entry_separator
+		self.memo_size = memo_size
+		self.memo: dict[str, dict] = {}
+		if positional:
+			self.compiled = [(name, int(field.key), field.convert, field.default) for name, field in fields.items()]
+		else:
+			self.wanted = {field.key: (name, field.convert, field.default) for name, field in fields.items()}
+
+	def select(self, names: Iterable[str]) -> "Schema":
+		"""Schema extracting only the given fields"""
+		return Schema({name: self.fields[name] for name in names}, self.positional, self.separator, self.entry_separator, self.memo_size)
+
+	def parse(self, entry: str) -> dict:
+		parts = entry.split(self.separator)
+		if self.positional:
+			return self.parse_positional(parts)
+
+		# one pass over the pairs, converting only the selected keys and stopping once they're all found
+		wanted = self.wanted
+		remaining = len(wanted)
+		result = {}
+		pairs = iter(parts)
+		for key, value in zip(pairs, pairs):
+			field = wanted.get(key)
+			if field is None:
+				continue
+
+			name, convert, default = field
+			try:
+				result[name] = convert(value)
+			except ValueError:
+				if default is REQUIRED:
+					raise
+				result[name] = default
+
+			remaining -= 1
+			if not remaining:
+				return result
+
+		for key, (name, convert, default) in wanted.items():
+			if name not in result:
+				if default is REQUIRED:
+					raise ValueError(f"Missing required key {key} ({name})")
+				result[name] = default
+
+		return result
+
+	def parse_positional(self, parts: list[str]) -> dict:
+		result = {}
+		for name, index, convert, default in self.compiled:
+			try:
+				result[name] = convert(parts[index])
+			except (IndexError, ValueError):
+				if default is REQUIRED:
+					raise
+				result[name] = default
+
+		return result
+
+	def parse_all(self, section: str) -> list[dict]:
+		"""Parse every entry of a section, reusing the memoized result for entries seen recently"""
+		memo = self.memo
+		result = []
+		for entry in section.split(self.entry_separator):
+			if not entry:
+				continue
+
+			parsed = memo.get(entry)
+			if parsed is None:
+				if len(memo) >= self.memo_size:
+					memo.clear()
+				parsed = memo[entry] = self.parse(entry)
+			result.append(parsed.copy()) # callers add and remove fields
+
+		return result
+
+class Page(NamedTuple):
+	total: int
+	offset: int
+	amount: int
+
+def sections(text: str) -> list[str]:
+	return text.split("#")
+
+def parse_page(section: str) -> Optional[Page]:
+	try:
+		return Page(*map(int, section.split(":")[:3]))
+	except (TypeError, ValueError):
+		return None
+
+LEVEL = Schema({
+	"_id": Field("1", int),
+	"name": Field("2"),
+	"creatorID": Field("6", int),
+	"length": Field("15", int, 0),
+	"stars": Field("18", int, 0),
+	"featured": Field("19", int, 0),
+	"epic": Field("42", int, 0),
+	"demon_difficulty": Field("43", int, 3)
+})
+
+CREATOR = Schema({
+	"_id": Field("0", int),
+	"name": Field("1"),
+	"accountID": Field("2", int, 0)
+}, positional=True)
+
+USER = Schema({
+	"name": Field("1"),
+	"playerID": Field("2", int),
+	"accountID": Field("16", int, 0)
+})
+
+class LevelsResponse(NamedTuple):
+	levels: list[dict]
+	creators: list[dict]
+	page: Optional[Page]
+	hash: str
+
+def parse_levels(text: str, level: Schema = LEVEL, creator: Schema = CREATOR) -> LevelsResponse:
+	"""Parse a getGJLevels21 response (levels#creators#songs#page#hash)"""
+	parts = sections(text)
+	parts += [""] * (5 - len(parts))
+	return LevelsResponse(level.parse_all(parts[0]), creator.parse_all(parts[1]), parse_page(parts[3]), parts[4])
+
+def parse_users(text: str, user: Schema = USER) -> tuple[list[dict], Optional[Page]]:
+	"""Parse a getGJUsers20 response (users#page)"""
+	parts = sections(text)
+	return user.parse_all(parts[0]), parse_page(parts[1]) if len(parts) > 1 else None
@@ -1,5 +1,5 @@
 import random
-import discord, os, json, re, git, asyncio, logging
+import discord, re, git, asyncio, logging
 from dotenv import load_dotenv
 from os import environ
 from discord.ext import commands, tasks
@@ -8,9 +8,15 @@ from discord import app_commands
 from datetime import datetime, UTC
 from math import ceil
 from enum import Enum
-from typing import Literal
-
-from db import SendDB
+from typing import Literal, Optional
+
+from db import SendDB, AsyncSendDB, WriteBatch
+from autocomplete import AutocompleteService
+from detection import SendDetector
+from state import StateStore
+from dispatch import DMDispatcher
+from announce import Announcer
+from trending import TrendingPublisher
 import utils
 
 logging.basicConfig(
@@ -25,7 +31,7 @@ connection_string = environ.get('MONGO_CONNECTION_STRING')
 if connection_string is None:
 	raise EnvironmentError("MONGO_CONNECTION_STRING environment variable is not set.")
 
-db = SendDB(connection_string)
+db = AsyncSendDB(SendDB(connection_string, follow_graph=True))
 
 OLDEST_LEVEL = int(environ.get("OLDEST_LEVEL"))
 DIFFICULTIES = {
@@ -59,7 +65,7 @@ RATINGS = {
 async def is_moderator(interaction: discord.Interaction) -> bool:
 	"""Check if a user is a moderator"""
 	# Check if the user is in the moderators collection
-	if db.is_moderator(interaction.user.id):
+	if await db.is_moderator(interaction.user.id):
 		return True
 
 	# If not a moderator, let them know
@@ -75,118 +81,58 @@ def get_git_info():
 commit_hash, upstream_url = get_git_info()
 invite = environ.get("INVITE")
 
-def load_previous_data():
-	if os.path.exists("previous_data.json"):
-		with open("previous_data.json", "r") as file:
-			data = json.load(file)
-			return data
-	return {}
-
-def save_previous_data(levels, rated_levels, rate_cache):
-	data = {
-		"previous_levels": levels,
-		"previous_rated_levels": rated_levels,
-		"rate_cache": rate_cache,
-		"trending_message": client.trendingMessageID
-	}
-	with open("previous_data.json", "w") as file:
-		json.dump(data, file)
-
-previous_data = load_previous_data()
-previous_levels = previous_data.get("previous_levels", [])
-rate_cache = previous_data.get("pending_rates", {})
-previous_rated_levels = previous_data.get("previous_rated_levels", [])
-
-RATE_CACHE_TIME = 20
-
-def calculateNewSends(levels: list[int], rated_levels: list[int], current_time: float) -> tuple[list[int], list[int]]:
-	global previous_levels, previous_rated_levels, rate_cache
-
-	filtered_levels = [level for level in levels if level not in rated_levels]
-
-	if not previous_levels:
-		previous_levels = levels.copy()
-		previous_rated_levels = rated_levels.copy()
-		return filtered_levels.copy(), rated_levels.copy()
-
-	rates = [level for level in rated_levels if level not in previous_rated_levels]
-	for level in rates:
-		rate_cache[level] = current_time
-
-	expired_levels = [level for level, timestamp in rate_cache.items() if current_time - timestamp > RATE_CACHE_TIME]
-	for level in expired_levels:
-		del rate_cache[level]
-
-	prev_levels_working = previous_levels.copy()
-	ignore_count = 0
-
-	for level in rate_cache.keys():
-		if level in prev_levels_working:
-			prev_levels_working.remove(level)
-			ignore_count += 1
-
-	check_limit = len(filtered_levels) - ignore_count
-	max_bumps = 0
-
-	for i in range(check_limit):
-		level = filtered_levels[i]
-		prev_index = prev_levels_working.index(level) if level in prev_levels_working else float('inf')
-
-		if i < prev_index:
-			bumps_after = i
-			total_bumps_including_this = bumps_after + 1
-			max_bumps = max(max_bumps, total_bumps_including_this)
-
-	sends = filtered_levels[:max_bumps]
-	sends.reverse()
-
-	previous_levels = levels.copy()
-	previous_rated_levels = rated_levels.copy()
-	save_previous_data(previous_levels, previous_rated_levels, rate_cache)
+state = StateStore("previous_data.json")
+previous_data = state.load()
+detector = SendDetector(
+	previous_data.get("previous_levels", []),
+	previous_data.get("previous_rated_levels", []),
+	previous_data.get("rate_cache", {}),
+	previous_data.get("polls", 0)
+)
 
+async def calculateNewSends(levels: list[int], rated_levels: list[int]) -> tuple[list[int], list[int]]:
+	sends, rates = detector.update(levels, rated_levels)
+	await state.save(
+		previous_levels=detector.previous_levels,
+		previous_rated_levels=detector.previous_rated_levels,
+		rate_cache=detector.rate_cache,
+		polls=detector.polls
+	)
 	return sends, rates
 
-async def onSendResults(levels: list[dict], creators: list[dict], rated_levels: list[dict], rated_creators: list[dict]):
+async def onSendResults(levels: list[dict], creators: list[dict], rated_levels: list[dict], rated_creators: list[dict]) -> Optional[int]:
 	if not levels or not creators or not rated_levels or not rated_creators:
 		print("No data received.")
 		return
 
+	timer = utils.StageTimer()
 	timestamp = datetime.now(UTC)
 
-	creatorMap = {creator["_id"]: creator["name"] for creator in creators + rated_creators}
-	accountMap = {creator["_id"]: creator["accountID"] for creator in creators + rated_creators}
-	level_ids = [level["_id"] for level in levels]
-	rated_level_ids = [level["_id"] for level in rated_levels]
+	# parse
+	levelMap = {level["_id"]: level for level in levels}
+	ratedLevelMap = {level["_id"]: level for level in rated_levels}
+	creatorMap = {creator["_id"]: creator for creator in creators + rated_creators}
+	timer.lap("parse")
 
-	new_send_ids, new_rate_ids = calculateNewSends(level_ids, rated_level_ids, timestamp.timestamp())
+	# diff
+	new_send_ids, new_rate_ids = await calculateNewSends([level["_id"] for level in levels], [level["_id"] for level in rated_levels])
+	timer.lap("diff")
 
+	# build records
 	sends = []
 	rates = []
-	unrates = []
 	info = []
-	sendMessageInfo = []
-	rateMessageInfo = []
+	sendMessageInfo = {}
+	rateMessageInfo = {}
 
 	for level_id in new_send_ids:
-		level = next(l for l in levels if l["_id"] == level_id)
-		creator_id = level["creatorID"]
-		creator_name = creatorMap.get(creator_id, "Unknown")
-
+		level = levelMap[level_id]
 		sends.append({"levelID": level_id, "timestamp": timestamp})
-		info.append({"_id": level_id, "name": level["name"], "creator": creator_id, "length": level["length"], "platformer": level["platformer"]})
-		sendMessageInfo.append({
-			"_id": level_id,
-			"name": level["name"],
-			"creator": creator_name,
-			"creatorID": accountMap.get(creator_id, 0),
-			"playerID": creator_id,
-			"sends": 1
-		})
+		info.append(levelInfoRecord(level))
+		sendMessageInfo[level_id] = levelMessageInfo(level, creatorMap) | {"sends": 1}
 
 	for level_id in new_rate_ids:
-		level = next(l for l in rated_levels if l["_id"] == level_id)
-		creator_id = level["creatorID"]
-
+		level = ratedLevelMap[level_id]
 		rates.append({
 			"_id": level_id,
 			"difficulty": level["difficulty"],
@@ -194,71 +140,91 @@ async def onSendResults(levels: list[dict], creators: list[dict], rated_levels:
 			"points": level["points"],
 			"timestamp": timestamp
 		})
-		info.append({"_id": level_id, "name": level["name"], "creator": creator_id, "length": level["length"], "platformer": level["platformer"]})
+		info.append(levelInfoRecord(level))
 
 		stars = DIFFICULTIES.get(level["stars"], "Unknown")
 		if level["stars"] == 10:
 			stars = DEMON_DIFFICULTY_MAP.get(level["difficulty"], "") + stars
 
-		rateMessageInfo.append({
-			"_id": level_id,
-			"name": level["name"],
-			"creator": creatorMap.get(creator_id, "Unknown"),
-			"creatorID": accountMap.get(creator_id, 0),
-			"playerID": creator_id,
+		rateMessageInfo[level_id] = levelMessageInfo(level, creatorMap) | {
 			"stars": stars,
 			"points": level["points"],
 			"rating": RATINGS.get(level["points"], "Unknown"),
 			"sends": 0
-		})
+		}
+	timer.lap("build")
+
+	# persist
+	batch = WriteBatch(sends, rates, info)
+	if sendMessageInfo:
+		batch.creators += creators
+	if rateMessageInfo:
+		batch.creators += rated_creators
+	await db.commit(batch)
+
+	sendMap = await db.get_sends(list(sendMessageInfo) + list(rateMessageInfo)) if sendMessageInfo or rateMessageInfo else {}
+	for level_id, sendCount in sendMap.items():
+		level = sendMessageInfo.get(level_id) or rateMessageInfo.get(level_id)
+		level["sends"] = sendCount["count"]
+	timer.lap("persist")
 
-	db.add_sends(sends)
-	db.add_rates(rates)
-	db.add_info(info)
+	# notify
+	if sends or rates:
+		client.trending.trigger()
 
-	if sends or rates or unrates:
-		await client.update_trending_message()
+	notifications = [(level, send_follower_embed(level, timestamp)) for level_id, level in sendMessageInfo.items() if level_id in sendMap]
+	notifications += [(level, rate_follower_embed(level, timestamp)) for level_id, level in rateMessageInfo.items() if level_id in sendMap]
+	if notifications:
+		asyncio.create_task(notify_followers(notifications))
 
 	if sendMessageInfo:
 		print("New sent levels!")
-		db.add_creators(creators)
-		checkIds = [level["_id"] for level in sendMessageInfo]
-		sendMap = db.get_sends(checkIds)
-		for sendID, sendCount in sendMap.items():
-			for level in sendMessageInfo:
-				if level["_id"] == sendID:
-					level["sends"] = sendCount["count"]
-					asyncio.create_task(notify_followers_of_send(level, timestamp))
-
-		asyncio.create_task(sendSendsMessage(sendMessageInfo, timestamp))
+		sendSendsMessage(list(sendMessageInfo.values()), timestamp)
 
 	if rateMessageInfo:
 		print("New rated levels!")
-		db.add_creators(rated_creators)
-		checkIds = [level["_id"] for level in rateMessageInfo]
-		sendMap = db.get_sends(checkIds)
-		for rateID, sendCount in sendMap.items():
-			for level in rateMessageInfo:
-				if level["_id"] == rateID:
-					level["sends"] = sendCount["count"]
-					asyncio.create_task(notify_followers_of_rate(level, timestamp))
-
-		asyncio.create_task(sendRatesMessage(rateMessageInfo, timestamp))
+		sendRatesMessage(list(rateMessageInfo.values()), timestamp)
+	timer.lap("notify")
+
+	await db.increase_stats({"poll_cycles": 1} | {f"poll_{stage}_ms": round(ms, 3) for stage, ms in timer.timings.items()})
+	if timer.total() > 1000:
+		logging.warning(f"Slow poll cycle: {', '.join(f'{stage} {ms:.0f}ms' for stage, ms in timer.timings.items())}")
+
+	return len(new_send_ids) + len(new_rate_ids)
+
+def levelInfoRecord(level: dict) -> dict:
+	return {"_id": level["_id"], "name": level["name"], "creator": level["creatorID"], "length": level["length"], "platformer": level["platformer"]}
+
+def levelMessageInfo(level: dict, creatorMap: dict[int, dict]) -> dict:
+	creator = creatorMap.get(level["creatorID"], {})
+	return {
+		"_id": level["_id"],
+		"name": level["name"],
+		"creator": creator.get("name", "Unknown"),
+		"creatorID": creator.get("accountID", 0),
+		"playerID": level["creatorID"]
+	}
 
 async def sendBanNotification():
 	await client.sendChannel.send("❌ **Bot was IP Banned!**")
 
-checker = utils.SentChecker(onSendResults, sendBanNotification, db)
+checker = utils.SentChecker(onSendResults, sendBanNotification, db, deep_pages=2, overflow_check=detector.overflowed)
 
 class SendBot(commands.Bot):
 	def __init__(self):
 		super().__init__(command_prefix='=', intents=discord.Intents.none())
 		self.sendChannel = None
 		self.trendingChannel = None
-		self.trendingMessageID = previous_data.get("trending_message", None)
-		self.trendingMessage = None
+		self.trending = TrendingPublisher(
+			self.fetch_trending,
+			self.render_trending,
+			lambda: self.trendingChannel,
+			previous_data.get("trending_message", None),
+			lambda message_id: state.save(trending_message=message_id)
+		)
 		self.synced = False
 		self.tips = []
+		self.backfill_task = None
 
 	async def setup_hook(self):
 		"""This method is called before on_ready to set up initial things"""
@@ -267,12 +233,10 @@ class SendBot(commands.Bot):
 
 	async def on_app_command_completion(self, interaction: discord.Interaction, command: app_commands.Command):
 		"""Event that triggers when a command is successfully executed"""
-		# Increment the commands run counter in the database
-		db.increase_stat("commands")
-
-		# Optional: You can add more detailed stats if needed
+		# Buffered and written by flush_stats
 		command_name = command.qualified_name
-		db.increase_stat(f"command_{command_name}")
+		await db.increase_stats({"commands": 1, f"command_{command_name}": 1})
+		await db.observe_latency(f"command_{command_name}", (discord.utils.utcnow() - interaction.created_at).total_seconds() * 1000)
 
 	async def on_ready(self):
 		await self.wait_until_ready()
@@ -280,6 +244,7 @@ class SendBot(commands.Bot):
 			await self.add_cog(FollowCommands(client))
 			await self.tree.sync()
 			self.synced = True
+			self.backfill_task = asyncio.create_task(self.backfill_search_fields())
 		await self.change_presence(activity=discord.Activity(name='Sent Levels', type=discord.ActivityType.watching), status=discord.Status.online)
 		self.sendChannel = (self.get_channel(int(environ.get('SEND_CHANNEL_ID'))) or await self.fetch_channel(int(environ.get('SEND_CHANNEL_ID'))))
 		if self.sendChannel is None or not self.sendChannel.is_news():
@@ -287,10 +252,14 @@ class SendBot(commands.Bot):
 
 		self.trendingChannel = (self.get_channel(int(environ.get('TRENDING_CHANNEL_ID'))) or await self.fetch_channel(int(environ.get('TRENDING_CHANNEL_ID'))))
 		if self.trendingChannel:
-			self.update_trending_message.start()
+			self.trending.trigger()
 		self.update_views.start()
+		if not self.flush_stats.is_running():
+			self.flush_stats.start()
 
-		checker.start(asyncio.get_running_loop())
+		checker.start()
+		dispatcher.start()
+		announcer.start()
 		print(f"We have logged in as {self.user}.")
 
 		client.tips = [
@@ -316,8 +285,16 @@ class SendBot(commands.Bot):
 		)
 
 	async def close(self):
-		checker.stop()
+		await checker.stop()
+		await dispatcher.stop()
+		await announcer.stop()
 		await super().close()
+		try:
+			await db.flush_stats()
+		except Exception as e:
+			logging.error(f"Error flushing stats: {e}", exc_info=True)
+		db.close()
+		state.close()
 
 	async def get_command_id(self, command_name: str):
 		bot_commands = await self.tree.fetch_commands()
@@ -326,63 +303,68 @@ class SendBot(commands.Bot):
 				return command.id
 		return None
 
-	@tasks.loop(minutes=1)
-	async def update_trending_message(self):
-		try:
-			trending_levels, _ = db.get_trending_levels()
-			embed = discord.Embed(
-				title="🔥 Trending Levels",
-				description="Most popular levels in the last 30 days",
-				color=0xff6600
-			)
-
-			for idx, level in enumerate(trending_levels, 1):
-				medal = ""
+	async def fetch_trending(self) -> list[dict]:
+		trending_levels, _ = await db.get_trending_levels()
+		return trending_levels
 
-				if idx == 1:
-					medal = "🥇"
-				elif idx == 2:
-					medal = "🥈"
-				elif idx == 3:
-					medal = "🥉"
+	async def render_trending(self, trending_levels: list[dict]) -> tuple[discord.Embed, str]:
+		embed = discord.Embed(
+			title="🔥 Trending Levels",
+			description="Most popular levels in the last 30 days",
+			color=0xff6600
+		)
 
-				embed.add_field(
-					name=f"{medal}#{idx}. {level['name']} ({level['levelID']})",
-					value=f"By **{level['creator']}** ({level['creatorID']})\n"
-						  f"Recent Sends: **{level['recent_sends']}**\n"
-						  f"Last Send: <t:{int(level['latest_send'].timestamp())}:R>\n"
-						  f"Score: `{int(level['score'])}`",
-					inline=False
-				)
+		for idx, level in enumerate(trending_levels, 1):
+			medal = ""
 
-			embed.timestamp = datetime.now(UTC)
-			command_id = await self.get_command_id("trending")
-			content = f"View the full leaderboard with </trending:{command_id}>" if command_id else ""
+			if idx == 1:
+				medal = "🥇"
+			elif idx == 2:
+				medal = "🥈"
+			elif idx == 3:
+				medal = "🥉"
 
-			if self.trendingMessage:
-				await self.trendingMessage.edit(embed=embed, content=content)
-			if self.trendingMessageID:
-				self.trendingMessage = await self.trendingChannel.fetch_message(self.trendingMessageID)
-				await self.trendingMessage.edit(embed=embed, content=content)
-			else:
-				self.trendingMessage = await self.trendingChannel.send(embed=embed, content=content)
-				self.trendingMessageID = self.trendingMessage.id
-				save_previous_data(previous_levels, previous_rated_levels, rate_cache)
+			embed.add_field(
+				name=f"{medal}#{idx}. {level['name']} ({level['levelID']})",
+				value=f"By **{level['creator']}** ({level['creatorID']})\n"
+					  f"Recent Sends: **{level['recent_sends']}**\n"
+					  f"Last Send: <t:{int(level['latest_send'].timestamp())}:R>\n"
+					  f"Score: `{int(level['score'])}`",
+				inline=False
+			)
 
-		except Exception as e:
-			logging.error(f"Error updating trending message: {e}", exc_info=True)
+		embed.timestamp = datetime.now(UTC)
+		command_id = await self.get_command_id("trending")
+		content = f"View the full leaderboard with </trending:{command_id}>" if command_id else ""
+		return embed, content
 
 	@tasks.loop(minutes=1)
 	async def update_views(self):
 		try:
-			db.refresh_materialized_views()
+			await db.refresh_materialized_views()
+			self.trending.trigger() # trending scores are recomputed here
 		except Exception as e:
 			logging.error(f"Error refreshing materialized views: {e}", exc_info=True)
 
+	@tasks.loop(seconds=30)
+	async def flush_stats(self):
+		try:
+			await db.flush_stats()
+		except Exception as e:
+			logging.error(f"Error flushing stats: {e}", exc_info=True)
+
+	async def backfill_search_fields(self):
+		try:
+			await db.backfill_search_fields()
+		except Exception as e:
+			logging.error(f"Error backfilling search fields: {e}", exc_info=True)
+
 	async def get_full_command_embed(self, command_name: str) -> str:
 		return f"</{command_name}:{await self.get_command_id(command_name)}>" if await self.get_command_id(command_name) else f"`/{command_name}`"
 
 client = SendBot()
+dispatcher = DMDispatcher(client, StateStore("dm_retries.json"), db.sync.counters)
+announcer = Announcer(lambda: client.sendChannel)
 
 async def sendRandomTip(interaction: discord.Interaction, exclude: list[int] = None) -> None:
 	if random.randint(1, 10) >= 3: return
@@ -484,7 +466,7 @@ class SearchModal(discord.ui.Modal):
 			self.id = None
 
 class LeaderboardView(View):
-	def __init__(self, db: SendDB, owner_id: int, page_size: int = 10):
+	def __init__(self, db: AsyncSendDB, owner_id: int, page_size: int = 10):
 		super().__init__(timeout=180)
 		self.db = db
 		self.owner_id = owner_id
@@ -499,216 +481,39 @@ class LeaderboardView(View):
 		self.add_item(self.type_select)
 		self.filter_select = FilterSelect(self)
 
-	def get_pipeline_for_type(self, skip: int, limit: int) -> list[dict]:
-		base_pipeline = [
-			{"$lookup": {
-				"from": "info",
-				"localField": "_id",
-				"foreignField": "_id",
-				"as": "level_info"
-			}},
-			{"$unwind": "$level_info"}
-		]
+	def get_filter_values(self) -> tuple[Optional[bool], Optional[bool]]:
+		"""Turn the selected filters into (rated, platformer), where None means no filtering"""
+		rated = None
+		platformer = None
 
 		if self.filters and self.type == LeaderboardType.LEVELS:
-			match_conditions = {}
 			if self.filters.__contains__("RATED") != self.filters.__contains__("UNRATED"):
-				base_pipeline.append({
-					"$lookup": {
-						"from": "rates",
-						"localField": "_id",
-						"foreignField": "_id",
-						"as": "rate_info"
-					}
-				})
-				if "RATED" in self.filters:
-					match_conditions["rate_info"] = {"$ne": []}
-				elif "UNRATED" in self.filters:
-					match_conditions["rate_info"] = {"$eq": []}
-
+				rated = "RATED" in self.filters
 			if self.filters.__contains__("PLATFORMER") != self.filters.__contains__("CLASSIC"):
-				if "PLATFORMER" in self.filters:
-					match_conditions["level_info.platformer"] = True
-				elif "CLASSIC" in self.filters:
-					match_conditions["level_info.platformer"] = False
-
-			if match_conditions:
-				base_pipeline.append({"$match": match_conditions})
-
-		if self.type == LeaderboardType.CREATORS:
-			base_pipeline.extend([
-				{"$group": {
-					"_id": "$level_info.creator",
-					"sends": {"$sum": "$send_count"},
-					"level_count": {"$sum": 1}
-				}},
-				{"$lookup": {
-					"from": "creators",
-					"localField": "_id",
-					"foreignField": "_id",
-					"as": "creator_info"
-				}},
-				{"$unwind": "$creator_info"},
-				{"$project": {
-					"name": "$creator_info.name",
-					"accountID": "$creator_info.accountID",
-					"sends": 1,
-					"level_count": 1
-				}}
-			])
-		else:
-			base_pipeline.extend([
-				{"$lookup": {
-					"from": "creators",
-					"localField": "level_info.creator",
-					"foreignField": "_id",
-					"as": "creator_info"
-				}},
-				{"$unwind": "$creator_info"},
-				{"$project": {
-					"name": "$level_info.name",
-					"creator": "$creator_info.name",
-					"creatorID": "$creator_info.accountID",
-					"levelID": "$_id",
-					"sends": "$send_count"
-				}}
-			])
-
-		base_pipeline.append({
-			"$addFields": {
-				"sort_key_send": {"score": "$sends", "tiebreak": {"$multiply": ["$_id", -1]}}
-			}
-		})
+				platformer = "PLATFORMER" in self.filters
 
-		base_pipeline.append({
-			"$setWindowFields": {
-				"sortBy": {"sort_key_send": -1},
-				"output": {
-					"rank": {"$rank": {}}
-				}
-			}
-		})
-
-		base_pipeline.append({
-			"$facet": {
-				"total": [{"$count": "count"}],
-				"data": [
-					{"$sort": {"sends": -1, "_id": 1}},
-					{"$skip": skip},
-					{"$limit": limit}
-				]
-			}
-		})
-
-		return base_pipeline
+		return rated, platformer
 
 	async def get_page_data(self) -> tuple[list[dict], int]:
 		skip = self.current_page * self.page_size
-		pipeline = self.get_pipeline_for_type(skip, self.page_size)
 
-		result = self.db.raw_pipeline("level_stats", pipeline)
-		if not result or not result[0]["total"]:
-			return [], 0
+		if self.type == LeaderboardType.CREATORS:
+			return await self.db.get_creator_leaderboard(skip, self.page_size)
 
-		return result[0]["data"], result[0]["total"][0]["count"]
+		rated, platformer = self.get_filter_values()
+		return await self.db.get_level_leaderboard(skip, self.page_size, rated, platformer)
 
-	async def find_page_for_id(self, search_id: int) -> int:
+	async def find_page_for_id(self, search_id: int) -> Optional[int]:
 		"""Find the page number containing the given ID"""
 		if self.type == LeaderboardType.CREATORS:
-			pipeline = [
-				{"$lookup": {
-					"from": "info",
-					"localField": "_id",
-					"foreignField": "_id",
-					"as": "level_info"
-				}},
-				{"$unwind": "$level_info"},
-				{"$group": {
-					"_id": "$level_info.creator",
-					"sends": {"$sum": "$send_count"}
-				}},
-				{"$lookup": {
-					"from": "creators",
-					"localField": "_id",
-					"foreignField": "_id",
-					"as": "creator_info"
-				}},
-				{"$unwind": "$creator_info"},
-				{"$sort": {
-					"sends": -1,
-					"_id": 1
-				}},
-				{"$group": {
-					"_id": None,
-					"position": {
-						"$push": "$_id"
-					}
-				}},
-				{"$project": {
-					"index": {
-						"$indexOfArray": ["$position", search_id]
-					}
-				}}
-			]
+			position = await self.db.get_creator_position(search_id)
 		else:
-			pipeline = [
-				{"$lookup": {
-					"from": "info",
-					"localField": "_id",
-					"foreignField": "_id",
-					"as": "level_info"
-				}},
-				{"$unwind": "$level_info"}
-			]
-
-			if self.filters:
-				match_conditions = {}
-				if self.filters.__contains__("RATED") != self.filters.__contains__("UNRATED"):
-					pipeline.append({
-						"$lookup": {
-							"from": "rates",
-							"localField": "_id",
-							"foreignField": "_id",
-							"as": "rate_info"
-						}
-					})
-					if "RATED" in self.filters:
-						match_conditions["rate_info"] = {"$ne": []}
-					elif "UNRATED" in self.filters:
-						match_conditions["rate_info"] = {"$eq": []}
-
-				if self.filters.__contains__("PLATFORMER") != self.filters.__contains__("CLASSIC"):
-					if "PLATFORMER" in self.filters:
-						match_conditions["level_info.platformer"] = True
-					elif "CLASSIC" in self.filters:
-						match_conditions["level_info.platformer"] = False
-
-				if match_conditions:
-					pipeline.append({"$match": match_conditions})
-
-			pipeline.extend([
-				{"$sort": {
-					"send_count": -1,
-					"_id": 1
-				}},
-				{"$group": {
-					"_id": None,
-					"position": {
-						"$push": "$_id"
-					}
-				}},
-				{"$project": {
-					"index": {
-						"$indexOfArray": ["$position", search_id]
-					}
-				}}
-			])
-
-		result = self.db.raw_pipeline("level_stats", pipeline)
-		if not result or result[0]["index"] == -1:
+			rated, platformer = self.get_filter_values()
+			position = await self.db.get_level_position(search_id, rated, platformer)
+
+		if position is None:
 			return None
 
-		position = result[0]["index"]
 		return position // self.page_size
 
 	def update_buttons(self):
@@ -744,7 +549,7 @@ class LeaderboardView(View):
 		start_idx = self.current_page * self.page_size
 
 		for idx, entry in enumerate(page_data, start=start_idx + 1):
-			medal = "⭐" if self.searched_id and self.searched_id == entry["accountID" if self.type == LeaderboardType.CREATORS else "levelID"] else ""
+			medal = "⭐" if self.searched_id and self.searched_id == entry["_id" if self.type == LeaderboardType.CREATORS else "levelID"] else ""
 
 			if idx == 1:
 				medal += "🥇"
@@ -833,7 +638,7 @@ class LeaderboardView(View):
 		await interaction.response.edit_message(embed=await self.get_embed(), view=self)
 
 class TrendingView(View):
-	def __init__(self, db: SendDB, owner_id: int, page_size: int = 10):
+	def __init__(self, db: AsyncSendDB, owner_id: int, page_size: int = 10):
 		super().__init__(timeout=180)
 		self.db = db
 		self.owner_id = owner_id
@@ -844,7 +649,7 @@ class TrendingView(View):
 
 	async def get_page_data(self) -> tuple[list[dict], int]:
 		skip = self.current_page * self.page_size
-		return self.db.get_trending_levels(skip, self.page_size, True)
+		return await self.db.get_trending_levels(skip, self.page_size, True)
 
 	def update_buttons(self):
 		self.prev_button.disabled = self.current_page == 0
@@ -939,10 +744,15 @@ def extract_id(input_string):
 
 	return None
 
+level_search = AutocompleteService(db.search_levels, lambda level: level["name"], substring_from=3)
+creator_search = AutocompleteService(db.search_creators, lambda creator: creator["name"])
+
 async def level_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
 	if not current or '(' in current or len(current) > 20:
 		return []
-	levels = db.search_levels(current)
+	levels = await level_search.query(interaction.user.id, current)
+	if levels is None:
+		return []
 	return [
 		app_commands.Choice(name=f"{level['name']} ({level['_id']})", value=str(level['_id']))
 		for level in levels
@@ -951,7 +761,9 @@ async def level_autocomplete(interaction: discord.Interaction, current: str) ->
 async def creator_autocomplete(interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
 	if not current or '(' in current or len(current) > 16:
 		return []
-	creators = db.search_creators(current)
+	creators = await creator_search.query(interaction.user.id, current)
+	if creators is None:
+		return []
 	return [
 		app_commands.Choice(name=f"{creator['name']} ({creator['_id']})", value=str(creator['_id']))
 		for creator in creators
@@ -969,7 +781,7 @@ class FollowCommands(commands.GroupCog, name="follow"):
 		creator_id = extract_id(creator)
 
 		# Verify creator exists
-		creators = db.get_creators([creator_id])
+		creators = await db.get_creators([creator_id])
 		if creator_id not in creators:
 			if not creator.isdigit():
 				if checker.is_user_pending(interaction.user.id):
@@ -981,8 +793,8 @@ class FollowCommands(commands.GroupCog, name="follow"):
 					if username == "" and player_id == 0 and account_id == 0:
 						await interaction.followup.send("❌ Creator not found", ephemeral=True)
 						return
-					db.add_creators([{"_id": player_id, "name": username, "accountID": account_id}])
-					db.add_follow(interaction.user.id, "creator", player_id)
+					await db.add_creators([{"_id": player_id, "name": username, "accountID": account_id}])
+					await db.add_follow(interaction.user.id, "creator", player_id, username)
 					await interaction.followup.send(f"✅ Now following **{username}** with ID: `{player_id}`", ephemeral=True)
 
 					await sendRandomTip(interaction, exclude=[0])
@@ -995,45 +807,37 @@ class FollowCommands(commands.GroupCog, name="follow"):
 			await interaction.followup.send(f"❌ Creator `{creator}` not found", ephemeral=True)
 			return
 
-		db.add_follow(interaction.user.id, "creator", creator_id)
+		await db.add_follow(interaction.user.id, "creator", creator_id, creators[creator_id]["name"])
 		await interaction.followup.send(f"✅ Now following **{creators[creator_id]['name']}**", ephemeral=True)
 
 		await sendRandomTip(interaction, exclude=[0])
 
 	@app_commands.command(name="level", description="Follow a level to get DM notifications when it is sent")
 	async def follow_level(self, interaction: discord.Interaction, level_id: int):
-		level_info = db.get_info([level_id])
-		if level_id in level_info:
-			level_name = f"**{level_info[level_id]['name']}**"
-		else:
-			level_name = f"`{level_id}`"
+		level_info = await db.get_info([level_id])
+		name = level_info[level_id]["name"] if level_id in level_info else None
+		level_name = f"**{name}**" if name is not None else f"`{level_id}`"
 
-		db.add_follow(interaction.user.id, "level", level_id)
+		await db.add_follow(interaction.user.id, "level", level_id, name)
 		await interaction.response.send_message(f"✅ Now following level {level_name}", ephemeral=True)
 
 		await sendRandomTip(interaction, exclude=[0])
 
 	@app_commands.command(name="list", description="List all your followed creators and levels")
 	async def list_follows(self, interaction: discord.Interaction):
-		follows = db.get_follows(interaction.user.id)
-		if not follows:
+		follows = await db.get_named_follows(interaction.user.id)
+		if not follows["creator"] and not follows["level"]:
 			await interaction.response.send_message("You're not following any creators or levels", ephemeral=True)
 			return
 
-		creator_ids = [f["followed_id"] for f in follows if f["type"] == "creator"]
-		level_ids = [f["followed_id"] for f in follows if f["type"] == "level"]
-
-		creators = db.get_creators(creator_ids)
-		levels = db.get_info(level_ids)
-
 		embed = discord.Embed(title="Your Follows", color=0x00ff00)
 
-		if creator_ids:
-			creator_list = "\n".join(f"• {creators[cid]['name']} ({cid})" for cid in creator_ids if cid in creators)
+		if follows["creator"]:
+			creator_list = "\n".join(f"• {creator['name']} ({creator['_id']})" for creator in follows["creator"] if creator["name"] is not None)
 			embed.add_field(name="Creators", value=creator_list or "None", inline=False)
 
-		if level_ids:
-			level_list = "\n".join(f"• {levels[lid]['name']} ({lid})" for lid in level_ids if lid in levels)
+		if follows["level"]:
+			level_list = "\n".join(f"• {level['name']} ({level['_id']})" for level in follows["level"] if level["name"] is not None)
 			embed.add_field(name="Levels", value=level_list or "None", inline=False)
 
 		await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -1042,13 +846,13 @@ class FollowCommands(commands.GroupCog, name="follow"):
 
 	@app_commands.command(name="unfollow", description="Unfollow a creator or level")
 	async def unfollow(self, interaction: discord.Interaction, type: Literal["creator", "level"], id: int):
-		db.remove_follow(interaction.user.id, type, id)
+		await db.remove_follow(interaction.user.id, type, id)
 		await interaction.response.send_message(f"✅ Unfollowed {type} `{id}`", ephemeral=True)
 
 		await sendRandomTip(interaction, exclude=[0])
 
-async def notify_followers_of_send(level_info: dict, timestamp: datetime):
-	await notify_followers_generic(
+def send_follower_embed(level_info: dict, timestamp: datetime) -> discord.Embed:
+	return level_embed(
 		level_info,
 		timestamp,
 		f"**{level_info['name']}** was just sent!",
@@ -1056,8 +860,8 @@ async def notify_followers_of_send(level_info: dict, timestamp: datetime):
 		0x00ff00
 	)
 
-async def notify_followers_of_rate(level_info: dict, timestamp: datetime):
-	await notify_followers_generic(
+def rate_follower_embed(level_info: dict, timestamp: datetime) -> discord.Embed:
+	return level_embed(
 		level_info,
 		timestamp,
 		f"{level_info['name']} was just rated!",
@@ -1065,13 +869,7 @@ async def notify_followers_of_rate(level_info: dict, timestamp: datetime):
 		0xd4af37
 	)
 
-async def notify_followers_generic(level_info: dict, timestamp: datetime, title: str, description: str, color: int):
-	level_followers = db.get_followers("level", level_info["_id"])
-	creator_followers = db.get_followers("creator", level_info["playerID"])
-
-	followers = set(level_followers + creator_followers)
-	if not followers: return
-
+def level_embed(level_info: dict, timestamp: datetime, title: str, description: str, color: int) -> discord.Embed:
 	embed = discord.Embed(
 		title=title,
 		description=description,
@@ -1083,63 +881,52 @@ async def notify_followers_generic(level_info: dict, timestamp: datetime, title:
 
 	embed.set_author(name=level_info["creator"], url=f"https://gdbrowser.com/{url}", icon_url="https://gdbrowser.com/assets/cp.png")
 	embed.timestamp = timestamp
+	return embed
 
-	for follower_id in followers:
-		try:
-			user = await client.fetch_user(follower_id)
-			await user.send(embed=embed)
-		except (discord.NotFound, discord.Forbidden):
-			continue
-
-async def sendSendsMessage(info: list[dict], timestamp: datetime):
-	embeds = []
-	for level in info:
-		embed = discord.Embed(
-			title=level["name"],
-			description=f"By **{level['creator']}** ({level['playerID']})\nTotal Sends: **{level['sends']}**\nLevel Info: [GDBrowser](https://gdbrowser.com/{level['_id']}) (`{level['_id']}`)\nMore data [online](<https://senddb.dev/level#{level['_id']}>)",
-			color=0x00ff00
-		)
-
-		if level["creatorID"] != 0: url = f"u/{level['creatorID']}"
-		else: url = f"search/{level['playerID']}?user"
-
-		embed.set_author(name=level["creator"], url=f"https://gdbrowser.com/{url}", icon_url="https://gdbrowser.com/assets/cp.png")
-		embed.timestamp = timestamp
-
-		embeds.append(embed)
-
-	num = len(info)
-	s = "s" if num != 1 else ""
-	message = await client.sendChannel.send(content=f"**{num}** level{s} sent.\nCheck time: <t:{int(timestamp.timestamp())}:F> (<t:{int(timestamp.timestamp())}:R>)", embeds=embeds)
-	try:
-		await message.publish()
-	except discord.Forbidden:
-		pass
-
-async def sendRatesMessage(info: list[dict], timestamp: datetime):
-	embeds = []
-	for level in info:
-		embed = discord.Embed(
-			title=level["name"],
-			description=f"Difficulty: **{level['stars']}**\nRating: **{level['rating']}** (+**{level['points']}**)\nBy **{level['creator']}** ({level['playerID']})\nTotal Sends: **{level['sends']}**\nLevel Info: [GDBrowser](https://gdbrowser.com/{level['_id']}) (`{level['_id']}`)\nMore data [online](<https://senddb.dev/level#{level['_id']}>)",
-			color=0xd4af37
-		)
-
-		if level["creatorID"] != 0: url = f"u/{level['creatorID']}"
-		else: url = f"search/{level['playerID']}?user"
-
-		embed.set_author(name=level["creator"], url=f"https://gdbrowser.com/{url}", icon_url="https://gdbrowser.com/assets/cp.png")
-		embed.timestamp = timestamp
-
-		embeds.append(embed)
+async def notify_followers(notifications: list[tuple[dict, discord.Embed]]):
+	"""DM everyone following the levels (or their creators), resolving all followers in one query"""
+	followers = await db.get_followers_bulk(
+		[level_info["_id"] for level_info, _ in notifications],
+		[level_info["playerID"] for level_info, _ in notifications]
+	)
 
-	num = len(info)
+	recipients = {}
+	for user_id, level_ids in followers.items():
+		for level_id in level_ids:
+			recipients.setdefault(level_id, []).append(user_id)
+
+	for level_info, embed in notifications:
+		if level_info["_id"] in recipients:
+			dispatcher.notify(recipients[level_info["_id"]], embed)
+
+def sendSendsMessage(info: list[dict], timestamp: datetime):
+	embeds = [
+		level_embed(
+			level,
+			timestamp,
+			level["name"],
+			f"By **{level['creator']}** ({level['playerID']})\nTotal Sends: **{level['sends']}**\nLevel Info: [GDBrowser](https://gdbrowser.com/{level['_id']}) (`{level['_id']}`)\nMore data [online](<https://senddb.dev/level#{level['_id']}>)",
+			0x00ff00
+		) for level in info
+	]
+	announcer.announce(lambda number, count: announcement_content(len(info), "sent", timestamp, number, count), embeds)
+
+def sendRatesMessage(info: list[dict], timestamp: datetime):
+	embeds = [
+		level_embed(
+			level,
+			timestamp,
+			level["name"],
+			f"Difficulty: **{level['stars']}**\nRating: **{level['rating']}** (+**{level['points']}**)\nBy **{level['creator']}** ({level['playerID']})\nTotal Sends: **{level['sends']}**\nLevel Info: [GDBrowser](https://gdbrowser.com/{level['_id']}) (`{level['_id']}`)\nMore data [online](<https://senddb.dev/level#{level['_id']}>)",
+			0xd4af37
+		) for level in info
+	]
+	announcer.announce(lambda number, count: announcement_content(len(info), "rated", timestamp, number, count), embeds)
+
+def announcement_content(num: int, action: str, timestamp: datetime, number: int, count: int) -> str:
 	s = "s" if num != 1 else ""
-	message = await client.sendChannel.send(content=f"**{num}** level{s} rated.\nCheck time: <t:{int(timestamp.timestamp())}:F> (<t:{int(timestamp.timestamp())}:R>)", embeds=embeds)
-	try:
-		await message.publish()
-	except discord.Forbidden:
-		pass
+	part = f" ({number}/{count})" if count > 1 else ""
+	return f"**{num}** level{s} {action}{part}.\nCheck time: <t:{int(timestamp.timestamp())}:F> (<t:{int(timestamp.timestamp())}:R>)"
 
 @client.tree.command(name="subscribe", description="Subscribe this channel to level send notifications.")
 @app_commands.describe()
@@ -1172,14 +959,14 @@ async def check_level(interaction: discord.Interaction, level: str):
 		await interaction.response.send_message(f"❌ Invalid level ID: `{level}`. Please provide a valid level ID or select from the autocomplete list.", ephemeral=True)
 		return
 
-	sendData = db.get_level_stats([level_numeric_id])
+	sendData = await db.get_level_stats([level_numeric_id])
 	if level_numeric_id not in sendData:
 		await interaction.response.send_message(f"{'⚠️ **WARNING**: This level was created before the bot started tracking levels. Any sends before the bot started operating have not been counted.\n\n' if level_numeric_id < OLDEST_LEVEL else ''}❌ Level `{level_numeric_id}` has no sends.", ephemeral=True)
 		return
 	sendCount = sendData[level_numeric_id]["count"]
 	lastSend: datetime = sendData[level_numeric_id]["latest_timestamp"]
 
-	infoData = db.get_info([level_numeric_id])
+	infoData = await db.get_info([level_numeric_id])
 	if level_numeric_id not in infoData:
 		levelData = {
 			"id": level_numeric_id,
@@ -1190,7 +977,7 @@ async def check_level(interaction: discord.Interaction, level: str):
 	else:
 		levelData = infoData[level_numeric_id]
 		levelData["id"] = level_numeric_id  # Ensure the ID is included for the view
-		creatorData = db.get_creators([levelData["creator"]])
+		creatorData = await db.get_creators([levelData["creator"]])
 
 		if levelData["creator"] not in creatorData:
 			levelData["creatorName"] = "Unknown"
@@ -1234,7 +1021,7 @@ async def check_creator(interaction: discord.Interaction, creator: str):
 		)
 		return
 
-	creatorData = db.get_creator_info(creator_numeric_id)
+	creatorData = await db.get_creator_info(creator_numeric_id)
 	if not creatorData:
 		await interaction.response.send_message(
 			f"❌ Creator `{creator_numeric_id}` has no sends.",
@@ -1287,14 +1074,20 @@ async def trending(interaction: discord.Interaction):
 
 @client.tree.command(name="info", description="Show the bot's info and stats.")
 async def info(interaction: discord.Interaction):
-	commands = db.get_stat("commands")
-	requests = db.get_stat("requests")
-	total_sends = db.get_total_sends()
-	total_creators = db.get_total_creators()
-	total_levels = db.get_total_levels()
-	oldest_level = db.get_oldest_level()
-	oldest_creator = db.get_oldest_creator()
-	latest_send = db.get_latest_send()
+	commands, requests, total_sends, total_creators, total_levels, oldest_level, oldest_creator, latest_send = await asyncio.gather(
+		db.get_stat("commands"),
+		db.get_stat("requests"),
+		db.get_total_sends(),
+		db.get_total_creators(),
+		db.get_total_levels(),
+		db.get_oldest_level(),
+		db.get_oldest_creator(),
+		db.get_latest_send()
+	)
+	dm_stats = dispatcher.stats()
+	cache_stats = await db.cache_stats()
+	cache_hits = sum(stats["hits"] for stats in cache_stats.values())
+	cache_lookups = cache_hits + sum(stats["misses"] for stats in cache_stats.values())
 
 	embed = discord.Embed(
 		title="Bot Stats",
@@ -1302,6 +1095,8 @@ async def info(interaction: discord.Interaction):
 Total Servers: `{len(client.guilds)}`
 Total Commands Run: `{commands}`
 Total Requests: `{requests}`
+DM Queue: `{dm_stats["queue_depth"]}` (p95 delivery ≤ `{dm_stats["p95_ms"]:g}ms`)
+DB Cache Hit Rate: `{cache_hits / cache_lookups if cache_lookups else 0:.1%}` of `{cache_lookups}` lookups
 
 Total Sends: `{total_sends}`
 Total Creators: `{total_creators}`
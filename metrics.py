@@ -0,0 +1,90 @@
+import bisect, threading
+
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class Histogram:
+	"""Latency histogram with fixed bucket bounds in milliseconds"""
+
+	def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS):
+		self.bounds = bounds
+		self.counts = [0] * (len(bounds) + 1) # the last bucket is everything above the largest bound
+		self.count = 0
+		self.sum = 0.0
+
+	def observe(self, ms: float):
+		self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+		self.count += 1
+		self.sum += ms
+
+	def merge(self, other: "Histogram"):
+		for i, count in enumerate(other.counts):
+			self.counts[i] += count
+		self.count += other.count
+		self.sum += other.sum
+
+	def percentile(self, fraction: float) -> float:
+		"""Upper bound of the bucket holding the given fraction of observations"""
+		target = fraction * self.count
+		seen = 0
+		for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+			seen += count
+			if count and seen >= target:
+				return bound
+		return 0.0
+
+	def increments(self) -> dict[str, float]:
+		"""$inc fields adding this histogram to a stored one"""
+		fields = {f"buckets.le_{bound}": count for bound, count in zip(self.bounds, self.counts) if count}
+		if self.counts[-1]:
+			fields["buckets.le_inf"] = self.counts[-1]
+		fields["count"] = self.count
+		fields["sum_ms"] = self.sum
+		return fields
+
+class Counters:
+	"""
+	Thread-safe registry of stat increments and latency observations waiting to be written. Increments to the
+	same stat coalesce, so a flush writes each stat once however often it changed.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.pending: dict[str, float] = {}
+		self.histograms: dict[str, Histogram] = {}
+
+	def add(self, stat: str, amount: float = 1):
+		with self.lock:
+			self.pending[stat] = self.pending.get(stat, 0) + amount
+
+	def add_many(self, amounts: dict[str, float]):
+		with self.lock:
+			for stat, amount in amounts.items():
+				self.pending[stat] = self.pending.get(stat, 0) + amount
+
+	def observe(self, name: str, ms: float):
+		with self.lock:
+			histogram = self.histograms.get(name)
+			if histogram is None:
+				histogram = self.histograms[name] = Histogram()
+			histogram.observe(ms)
+
+	def pending_amount(self, stat: str) -> float:
+		with self.lock:
+			return self.pending.get(stat, 0)
+
+	def drain(self) -> tuple[dict[str, float], dict[str, Histogram]]:
+		"""Take everything waiting to be written"""
+		with self.lock:
+			pending, histograms = self.pending, self.histograms
+			self.pending, self.histograms = {}, {}
+			return pending, histograms
+
+	def restore(self, pending: dict[str, float], histograms: dict[str, Histogram]):
+		"""Put back what a failed flush drained"""
+		self.add_many(pending)
+		with self.lock:
+			for name, histogram in histograms.items():
+				if name in self.histograms:
+					self.histograms[name].merge(histogram)
+				else:
+					self.histograms[name] = histogram
@@ -0,0 +1,34 @@
+from utils import PollScheduler
+
+clock = 0.0
+scheduler = PollScheduler(clock=lambda: clock)
+requests = 0
+
+def run_cycle(events: int) -> float:
+	"""Simulate one poll cycle (two requests, five seconds apart), returning its length"""
+	global clock, requests
+	start = clock
+	scheduler.spend(1)
+	clock += 5
+	scheduler.spend(1)
+	requests += 2
+	scheduler.observe(events)
+	clock += scheduler.delay(clock - start)
+	return clock - start
+
+# a quiet hour is polled slower than the baseline, saving up budget
+while clock < 60 * 60:
+	assert run_cycle(0) >= 10
+
+# so a burst is polled faster than it
+burst_cycles = [run_cycle(5) for _ in range(20)]
+assert burst_cycles[0] < 10, f"Expected a sub-10s burst interval, got {burst_cycles[0]}"
+assert all(length < 10 for length in burst_cycles)
+
+# a burst that outlasts the savings falls back to the baseline rate
+while clock < 3 * 60 * 60:
+	run_cycle(5)
+assert 10 <= run_cycle(5) < 10.5
+
+# never more requests than the fixed 10 second cycle would have made
+assert requests <= 2 + 2 * clock / 10, f"{requests} requests in {clock:.0f}s"
@@ -0,0 +1,98 @@
+import asyncio, json, logging, os, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+class StateStore:
+	"""
+	Checkpoint store for the bot's poll state: a JSON snapshot plus an append-only journal of changed fields.
+
+	Every save appends one line holding only the fields that changed since the last one. Once the journal
+	has `compact_every` lines, the merged state is written to a temporary file and renamed over the
+	snapshot, so a crash never leaves a half-written snapshot. A torn last journal line is ignored on load.
+	"""
+
+	INT_KEYED = ("rate_cache",) # JSON turns int keys into strings
+
+	def __init__(self, path: str = "previous_data.json", journal_path: str = None, compact_every: int = 200):
+		self.path = path
+		self.journal_path = journal_path or f"{path}.journal"
+		self.compact_every = compact_every
+		self.state: dict[str, Any] = {}
+		self.journal_lines = 0
+		self.lock = threading.Lock()
+		self.executor = ThreadPoolExecutor(max_workers=1) # keeps saves in order
+
+	def load(self) -> dict[str, Any]:
+		state = {}
+		if os.path.exists(self.path):
+			with open(self.path, "r") as file:
+				state = json.load(file)
+
+		lines = 0
+		torn = False
+		if os.path.exists(self.journal_path):
+			with open(self.journal_path, "r") as file:
+				for line in file:
+					try:
+						state.update(json.loads(line))
+						lines += 1
+					except json.JSONDecodeError:
+						logging.warning(f"Ignoring torn entry in {self.journal_path}")
+						torn = True
+						break
+
+		if "pending_rates" in state: # written by older versions
+			state.setdefault("rate_cache", state.pop("pending_rates"))
+		if "rate_cache" in state and "polls" not in state: # older versions stored when levels were rated, not the poll
+			state["rate_cache"] = {level: 0 for level in state["rate_cache"]}
+			state["polls"] = 0
+		for key in self.INT_KEYED:
+			if key in state:
+				state[key] = {int(level): value for level, value in state[key].items()}
+
+		with self.lock:
+			self.state = state
+			self.journal_lines = lines
+			if torn: # appending after a partial line would tear the next entry too
+				self.compact()
+
+		# callers mutate what they get back, which must not touch the last written state
+		return {key: value.copy() if isinstance(value, (list, dict)) else value for key, value in state.items()}
+
+	def update(self, fields: dict[str, Any]):
+		"""Write the fields that changed, compacting the journal when it's grown long enough"""
+		with self.lock:
+			changed = {key: value for key, value in fields.items() if self.state.get(key) != value}
+			if not changed:
+				return
+
+			self.state.update(changed)
+			if self.journal_lines + 1 >= self.compact_every:
+				self.compact()
+				return
+
+			with open(self.journal_path, "a") as file:
+				file.write(json.dumps(changed, separators=(",", ":")) + "\n")
+			self.journal_lines += 1
+
+	def compact(self):
+		temporary = f"{self.path}.tmp"
+		with open(temporary, "w") as file:
+			json.dump(self.state, file)
+			file.flush()
+			os.fsync(file.fileno())
+
+		os.replace(temporary, self.path)
+		open(self.journal_path, "w").close()
+		self.journal_lines = 0
+
+	async def save(self, **fields):
+		"""Save fields off the event loop; values are copied so later mutations don't leak into the write"""
+		fields = {key: value.copy() if isinstance(value, (list, dict)) else value for key, value in fields.items()}
+		await asyncio.get_running_loop().run_in_executor(self.executor, self.update, fields)
+
+	def close(self):
+		self.executor.shutdown(wait=True)
+		with self.lock:
+			if self.journal_lines:
+				self.compact()
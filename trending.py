@@ -0,0 +1,102 @@
+import asyncio, hashlib, logging
+from typing import Awaitable, Callable, Optional
+
+import discord
+
+class TrendingPublisher:
+	"""
+	Keeps one message showing the trending levels up to date.
+
+	Refreshes are requested with `trigger`; triggers within `debounce` seconds of each other share one
+	refresh. The message is only edited when a digest of the levels it shows changed, and the message object
+	is kept between edits instead of being fetched every time.
+	"""
+
+	def __init__(
+		self,
+		fetch: Callable[[], Awaitable[list[dict]]],
+		render: Callable[[list[dict]], Awaitable[tuple[discord.Embed, str]]],
+		channel: Callable[[], Optional[discord.abc.Messageable]],
+		message_id: Optional[int] = None,
+		on_message_id: Optional[Callable[[int], Awaitable]] = None,
+		debounce: float = 10
+	):
+		"""
+		Args:
+			fetch: Gets the trending levels to show
+			render: Builds the message embed and content for the levels
+			channel: Gets the channel the message is in, or None if it isn't available
+			message_id: ID of the message from a previous run, if any
+			on_message_id: Called with the ID of a newly sent message so it can be saved
+			debounce: Seconds to wait for more triggers before refreshing
+		"""
+		self.fetch = fetch
+		self.render = render
+		self.channel = channel
+		self.message_id = message_id
+		self.on_message_id = on_message_id
+		self.debounce = debounce
+		self.message: Optional[discord.Message] = None
+		self.last_digest: Optional[str] = None
+		self.dirty = False
+		self.task: Optional[asyncio.Task] = None
+
+	def trigger(self):
+		"""Request a refresh; it runs after the debounce window, together with any other triggers in it"""
+		self.dirty = True
+		if self.task is None or self.task.done():
+			self.task = asyncio.create_task(self.run())
+
+	async def run(self):
+		while self.dirty:
+			await asyncio.sleep(self.debounce)
+			self.dirty = False
+			try:
+				await self.refresh()
+			except Exception as e:
+				logging.error(f"Error updating trending message: {e}", exc_info=True)
+
+	async def refresh(self) -> bool:
+		"""Update the message if the trending levels changed, returning whether it was edited"""
+		channel = self.channel()
+		if channel is None:
+			return False
+
+		levels = await self.fetch()
+		digest = self.digest(levels)
+		if digest == self.last_digest:
+			return False
+
+		embed, content = await self.render(levels)
+		await self.publish(channel, embed, content)
+		self.last_digest = digest
+		return True
+
+	async def publish(self, channel: discord.abc.Messageable, embed: discord.Embed, content: str):
+		if self.message is None and self.message_id:
+			try:
+				self.message = await channel.fetch_message(self.message_id)
+			except discord.NotFound:
+				self.message_id = None
+
+		if self.message is not None:
+			try:
+				await self.message.edit(embed=embed, content=content)
+				return
+			except discord.NotFound: # deleted, post a new one
+				self.message = None
+				self.message_id = None
+
+		self.message = await channel.send(embed=embed, content=content)
+		self.message_id = self.message.id
+		if self.on_message_id:
+			await self.on_message_id(self.message_id)
+
+	@staticmethod
+	def digest(levels: list[dict]) -> str:
+		"""Digest of everything the message shows about the levels"""
+		shown = [
+			(level["levelID"], level["name"], level["creator"], level["creatorID"], level["recent_sends"], level["latest_send"], int(level["score"]))
+			for level in levels
+		]
+		return hashlib.sha1(repr(shown).encode()).hexdigest()
@@ -1,8 +1,14 @@
 import logging
 
-import requests, threading, time, asyncio, queue
+import aiohttp, asyncio, math, random, time
+from collections import deque
+from datetime import datetime, UTC
+from itertools import islice
 from typing import Optional, Callable
-from db import SendDB
+from db import AsyncSendDB, normalize_name
+import gj
+
+MAX_EMBEDS = 10 # per Discord message
 
 DEMON_MAP = {
 	3: 0,
@@ -12,253 +18,477 @@ DEMON_MAP = {
 	6: 4
 }
 
+SENT_LEVEL = gj.LEVEL.select(("_id", "name", "creatorID", "length"))
+RATED_LEVEL = gj.LEVEL.select(("_id", "name", "creatorID", "length", "stars", "featured", "epic", "demon_difficulty"))
+
+def sent_level(level: dict) -> dict:
+	"""Finish a level parsed with SENT_LEVEL"""
+	level["platformer"] = level["length"] == 5
+	return level
+
+def rated_level(level: dict) -> dict:
+	"""Finish a level parsed with RATED_LEVEL"""
+	level["platformer"] = level["length"] == 5
+	level["difficulty"] = DEMON_MAP.get(level.pop("demon_difficulty"), 0)
+	epic = level.pop("epic")
+	level["points"] = (1 if level["stars"] > 0 else 0) + (1 if level.pop("featured") > 0 else 0) + (epic if epic > 0 else 0) # https://github.com/RedLime/DemonObserver/blob/1.2-master/src/classes/demon.js#L4
+	return level
+
 class Ratelimited(Exception):
 	pass
 
 class Banned(Exception):
 	pass
 
+class Backoff:
+	"""Exponential backoff with jitter for consecutive ratelimits"""
+
+	def __init__(self, base: float = 60, cap: float = 60*60):
+		self.base = base
+		self.cap = cap
+		self.failures = 0
+
+	def next(self) -> float:
+		"""Seconds to wait after being ratelimited"""
+		delay = min(self.cap, self.base * 2 ** self.failures)
+		self.failures += 1
+		return random.uniform(delay / 2, delay)
+
+	def reset(self):
+		self.failures = 0
+
+class PollScheduler:
+	"""
+	Decides how long each poll cycle should take, based on how fast new sends and rates arrive.
+
+	Keeps a smoothed rate of new events per second for every hour of the day (UTC) and aims for
+	`target_events` new events per cycle, so busy hours are polled faster and quiet hours slower.
+	While a burst is in progress it polls as fast as allowed. Ratelimits back off exponentially with jitter.
+
+	Requests are paid for from a budget refilled at the rate of the fixed cycle this replaced
+	(`baseline_requests` every `baseline_interval` seconds), so polling faster than that during a burst
+	uses up what slower polling saved, and request volume never goes above the baseline for long.
+	"""
+
+	def __init__(
+		self,
+		min_interval: float = 6,
+		max_interval: float = 30,
+		default_interval: float = 10,
+		target_events: float = 1,
+		smoothing: float = 0.1,
+		backoff_base: float = 60,
+		backoff_cap: float = 60*60,
+		baseline_interval: float = 10,
+		baseline_requests: float = 2,
+		budget_cap: float = 120,
+		clock: Callable[[], float] = time.monotonic
+	):
+		"""
+		Args:
+			baseline_interval: Length of the fixed poll cycle the budget refills at
+			baseline_requests: Requests one poll cycle makes
+			budget_cap: Most requests that can be saved up for bursts
+			clock: Monotonic clock in seconds
+		"""
+		self.min_interval = min_interval
+		self.max_interval = max_interval
+		self.default_interval = default_interval
+		self.target_events = target_events
+		self.smoothing = smoothing
+		self.backoff_base = backoff_base
+		self.backoff_cap = backoff_cap
+		self.ratelimits = Backoff(backoff_base, backoff_cap)
+		self.refill_rate = baseline_requests / baseline_interval
+		self.baseline_requests = baseline_requests
+		self.budget_cap = budget_cap
+		self.clock = clock
+		self.budget = baseline_requests # enough for the first poll
+		self.budget_time = clock()
+		self.hourly_rates: list[Optional[float]] = [None] * 24
+		self.last_observed: Optional[float] = None
+		self.burst = False
+
+	def observe(self, events: int):
+		"""Record how many new sends/rates the latest poll found"""
+		now = self.clock()
+		if self.last_observed is not None:
+			rate = events / max(now - self.last_observed, 1)
+			hour = datetime.now(UTC).hour
+			previous = self.hourly_rates[hour]
+			self.hourly_rates[hour] = rate if previous is None else previous + self.smoothing * (rate - previous)
+
+		self.last_observed = now
+		self.burst = events > self.target_events
+
+	def interval(self) -> float:
+		"""Seconds the next poll cycle should take"""
+		if self.burst:
+			return self.min_interval
+
+		rate = self.hourly_rates[datetime.now(UTC).hour]
+		if rate is None:
+			return self.default_interval
+		if rate <= 0:
+			return self.max_interval
+
+		return min(self.max_interval, max(self.min_interval, self.target_events / rate))
+
+	def refill(self):
+		now = self.clock()
+		self.budget = min(self.budget_cap, self.budget + (now - self.budget_time) * self.refill_rate)
+		self.budget_time = now
+
+	def spend(self, requests: int):
+		"""Pay for requests that were made"""
+		self.refill()
+		self.budget -= requests
+
+	def delay(self, elapsed: float) -> float:
+		"""Seconds to wait before the next poll cycle, given how long the current one has taken so far"""
+		self.refill()
+		affordable = (self.baseline_requests - self.budget) / self.refill_rate # until the next cycle is paid for
+		return max(0.0, self.interval() - elapsed, affordable)
+
+	def backoff(self) -> float:
+		"""Seconds to wait after the level poll was ratelimited"""
+		return self.ratelimits.next()
+
+	def reset(self):
+		self.ratelimits.reset()
+
+class StageTimer:
+	"""Times consecutive stages of a pipeline, in milliseconds"""
+
+	def __init__(self):
+		self.timings: dict[str, float] = {}
+		self.last = time.perf_counter()
+
+	def lap(self, stage: str):
+		"""End the current stage, named `stage`, and start the next one"""
+		now = time.perf_counter()
+		self.timings[stage] = self.timings.get(stage, 0) + (now - self.last) * 1000
+		self.last = now
+
+	def total(self) -> float:
+		return sum(self.timings.values())
+
 class SentChecker:
-	def __init__(self, callback: Callable, ban_callback: Optional[Callable] = None, db: Optional[SendDB] = None):
-		self.q: queue.Queue = queue.Queue()
-		self.pending_checks: dict[str, list[Callable]] = {}
+	def __init__(
+		self,
+		callback: Callable,
+		ban_callback: Optional[Callable] = None,
+		db: Optional[AsyncSendDB] = None,
+		sent_delay: float = 5,
+		account_delay: float = 5,
+		account_batch: int = 3,
+		scheduler: Optional[PollScheduler] = None,
+		deep_pages: int = 0,
+		overflow_check: Optional[Callable[[list[int], list[int]], bool]] = None
+	):
+		"""
+		Args:
+			callback: Coroutine called with the sent and rated levels/creators after every poll, returning the
+				number of new sends and rates found (or None if the poll couldn't be used)
+			ban_callback: Coroutine called once if the server bans the bot
+			db: Database used to look up known creators and count requests
+			sent_delay: Seconds to wait between polling sent and rated levels
+			account_delay: Seconds between account lookup rounds
+			account_batch: Maximum number of usernames looked up on the servers per round
+			scheduler: Decides the length of each poll cycle and the ratelimit backoff
+			deep_pages: Extra pages of sent levels fetched when the first one overflowed, or 0 to never fetch them
+			overflow_check: Called with the sent and rated level IDs, returning whether every level on the sent page
+				may have been bumped since the previous poll
+		"""
+		self.pending_checks: dict[str, list[tuple[Callable, tuple, int]]] = {}
+		self.pending_users: dict[int, str] = {}
+		self.queue_positions: dict[str, int] = {}
+		self.queue_order: deque[tuple[int, str]] = deque()
+		self.enqueued = 0
+		self.round_time = account_delay + 1
+		self.pending_event = asyncio.Event()
+		self.checked_locally: set[str] = set()
 		self.callback = callback
 		self.ban_callback = ban_callback
-		self.lock = threading.Lock()
-		self.loop: Optional[asyncio.AbstractEventLoop] = None
-		self.thread: Optional[threading.Thread] = None
-		self.running = threading.Event()
 		self.db = db
-
-	def start(self, loop: asyncio.AbstractEventLoop):
-		"""Start the worker thread with the given event loop"""
-		self.loop = loop
-		self.running.set()
-		self.thread = threading.Thread(target=self.worker)
-		self.thread.daemon = True
-		self.thread.start()
-
-	def stop(self):
-		"""Stop the worker thread"""
-		if self.running.is_set():
-			self.running.clear()
-			self.q.put((None, None))
-			if self.thread:
-				self.thread.join(timeout=5)
-
-	def worker(self):
-		while self.running.is_set():
+		self.sent_delay = sent_delay
+		self.account_delay = account_delay
+		self.account_batch = account_batch
+		self.scheduler = scheduler or PollScheduler()
+		self.account_backoff = Backoff(self.scheduler.backoff_base, self.scheduler.backoff_cap) # separate from the level poll's
+		self.deep_pages = deep_pages
+		self.overflow_check = overflow_check
+		self.session: Optional[aiohttp.ClientSession] = None
+		self.task: Optional[asyncio.Task] = None
+		self.account_task: Optional[asyncio.Task] = None
+
+	def start(self):
+		"""Start polling on the running event loop"""
+		if self.task and not self.task.done():
+			return
+
+		self.session = aiohttp.ClientSession(
+			headers={"User-Agent": ""},
+			connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+			timeout=aiohttp.ClientTimeout(total=30)
+		)
+		self.task = asyncio.create_task(self.worker())
+		self.account_task = asyncio.create_task(self.account_worker())
+
+	async def stop(self):
+		"""Stop polling and close the HTTP session"""
+		for task in (self.task, self.account_task):
+			if task:
+				task.cancel()
+				try:
+					await task
+				except asyncio.CancelledError:
+					pass
+		self.task = None
+		self.account_task = None
+
+		if self.session:
+			await self.session.close()
+			self.session = None
+
+	async def worker(self):
+		while True:
 			try:
-				username = self.q.get(timeout=1)
-			except queue.Empty:
-				username = None
+				cycle_start = time.monotonic()
+				levels, creators = await self.getSentLevels()
+				self.scheduler.spend(1)
+				await self.db.increase_stat("requests", 1)
 
-			try:
-				with self.lock:
-					if not self.running.is_set():
-						break
-
-					levels, creators = self.getSentLevels()
-					self.db.increase_stat("requests", 1)
-
-					time.sleep(2)
-
-					if username:
-						callbacks = self.pending_checks.pop(username, [])
-						username, player_id, account_id = self.check_account(username)
-						self.db.increase_stat("requests", 1)
-						for callback, args, _ in callbacks:
-							if self.running.is_set() and self.loop and not self.loop.is_closed():
-								self.loop.call_soon_threadsafe(
-									lambda: asyncio.create_task(callback(username, player_id, account_id, *args))
-								)
-
-					time.sleep(3)
-
-					rated_levels, rated_creators = self.getRatedLevels()
-					self.db.increase_stat("requests", 1)
-					if self.running.is_set() and self.loop and not self.loop.is_closed():
-						self.loop.call_soon_threadsafe(
-							lambda: asyncio.create_task(self.callback(levels, creators, rated_levels, rated_creators))
-						)
-					time.sleep(5)
-
-				if username:
-					self.q.task_done()
+				await asyncio.sleep(self.sent_delay)
+
+				rated_levels, rated_creators = await self.getRatedLevels()
+				self.scheduler.spend(1)
+				await self.db.increase_stat("requests", 1)
+
+				if self.deep_pages and levels and self.overflow_check and self.overflow_check(
+					[level["_id"] for level in levels], [level["_id"] for level in rated_levels]
+				):
+					levels, creators = await self.getDeepSentLevels(levels, creators)
+
+				self.scheduler.reset()
+				task = asyncio.create_task(self.callback(levels, creators, rated_levels, rated_creators))
+				task.add_done_callback(self.observe_results)
+
+				await asyncio.sleep(self.scheduler.delay(time.monotonic() - cycle_start))
 
 			except Ratelimited:
-				time.sleep(60*60)
+				await asyncio.sleep(self.scheduler.backoff())
 			except Banned:
 				if self.ban_callback:
-					asyncio.run_coroutine_threadsafe(self.ban_callback(), self.loop)
+					await self.ban_callback()
 				break
 			except Exception as e:
-				logging.error(f"Error in worker thread: {e}", exc_info=True)
-				time.sleep(10)
-
-	@staticmethod
-	def getSentLevels() -> tuple[list[dict], list[dict]]:
+				logging.error(f"Error in checker worker: {e}", exc_info=True)
+				await asyncio.sleep(10)
+
+	async def account_worker(self):
+		"""Resolve queued usernames in rounds, independently of the level polls"""
+		try:
+			while True:
+				await self.pending_event.wait()
+				start = time.monotonic()
+
+				try:
+					await self.resolve_pending()
+					self.account_backoff.reset()
+				except Ratelimited:
+					await asyncio.sleep(self.account_backoff.next())
+				except Banned:
+					break # the level poll reports the ban
+				except Exception as e:
+					logging.error(f"Error in account worker: {e}", exc_info=True)
+					await asyncio.sleep(10)
+
+				if not self.pending_checks:
+					self.pending_event.clear()
+
+				await asyncio.sleep(self.account_delay)
+				self.round_time = 0.7 * self.round_time + 0.3 * (time.monotonic() - start)
+		finally:
+			# nothing will resolve them anymore
+			for username in list(self.pending_checks):
+				self.complete_check(username, "", 0, 0)
+
+	async def resolve_pending(self):
+		"""
+		Resolve every pending username known to the local creators collection, then look up to
+		`account_batch` of the remaining ones on the servers concurrently.
+		"""
+		usernames = [username for username in self.pending_checks if username not in self.checked_locally]
+		if usernames:
+			known = await self.db.get_creators_by_names(usernames)
+			for username in usernames:
+				creator = known.get(normalize_name(username))
+				if creator:
+					self.complete_check(username, creator["name"], creator["_id"], creator["accountID"])
+				else:
+					self.checked_locally.add(username)
+
+		batch = list(islice(self.pending_checks, self.account_batch))
+		if not batch:
+			return
+
+		results = await asyncio.gather(*(self.check_account(username) for username in batch), return_exceptions=True)
+		await self.db.increase_stat("requests", len(batch))
+
+		for username, result in zip(batch, results):
+			if isinstance(result, (Ratelimited, Banned)):
+				continue # stays pending and is retried
+			if isinstance(result, Exception):
+				logging.error(f"Error checking account {username}: {result}", exc_info=result)
+				result = ("", 0, 0)
+			self.complete_check(username, *result)
+
+		for result in results:
+			if isinstance(result, (Ratelimited, Banned)):
+				raise result
+
+	def complete_check(self, username: str, name: str, player_id: int, account_id: int):
+		self.checked_locally.discard(username)
+		self.queue_positions.pop(username, None)
+		for callback, args, user in self.pending_checks.pop(username, []):
+			if self.pending_users.get(user) == username:
+				del self.pending_users[user]
+			asyncio.create_task(callback(name, player_id, account_id, *args))
+
+	def observe_results(self, task: asyncio.Task):
+		if task.cancelled() or task.exception() is not None or task.result() is None:
+			return
+
+		self.scheduler.observe(task.result())
+
+	async def post(self, url: str, data: dict) -> str:
+		async with self.session.post(url, data=data) as response:
+			return await response.text()
+
+	async def getLevels(self, type: int, level: gj.Schema, page: int = 0) -> tuple[list[dict], list[dict]]:
 		data = {
-			"type": 27,  # new sent levels type
+			"type": type,
+			"page": page,
 			"secret": "Wmfd2893gb7"
 		}
 
-		headers = {
-			"User-Agent": ""
-		}
-
-		req = requests.post('http://www.boomlings.com/database/getGJLevels21.php', data=data, headers=headers)
-		SentChecker.check_errors(req)
-
-		if req.text == "-1": return [], []
-
-		parsed = req.text.split("#")
-		rawLevels = parsed[0].split("|")
-		rawCreators = parsed[1].split("|")
+		text = await self.post('http://www.boomlings.com/database/getGJLevels21.php', data)
+		SentChecker.check_errors(text)
 
-		levels = []
+		if text == "-1": return [], []
 
-		for level in rawLevels:
-			parts = level.split(":")
-			data = {parts[i]: parts[i + 1] for i in range(0, len(parts), 2)}
-			_15 = int(data.get("15", 0))
-			levels.append({
-				"_id": int(data["1"]),
-				"name": data["2"],
-				"creatorID": int(data["6"]),
-				"length": _15,
-				"platformer": (_15 == 5)
-			})
+		response = gj.parse_levels(text, level)
+		return response.levels, response.creators
 
-		creators = []
-
-		for creator in rawCreators:
-			parts = creator.split(":")
-			try:
-				accountID = int(parts[2])
-			except Exception:
-				accountID = 0
-			creators.append({
-				"_id": int(parts[0]),
-				"name": parts[1],
-				"accountID": accountID
-			})
+	async def getSentLevels(self, page: int = 0) -> tuple[list[dict], list[dict]]:
+		levels, creators = await self.getLevels(27, SENT_LEVEL, page) # new sent levels type
+		for level in levels:
+			sent_level(level)
 
 		return levels, creators
 
-	@staticmethod
-	def getRatedLevels() -> tuple[list[dict], list[dict]]:
-		data = {
-			"type": 11,  # rated levels type
-			"secret": "Wmfd2893gb7"
-		}
+	async def getDeepSentLevels(self, levels: list[dict], creators: list[dict]) -> tuple[list[dict], list[dict]]:
+		"""Fetch the next `deep_pages` pages of sent levels concurrently and append them to the first one"""
+		pages = await asyncio.gather(*(self.getSentLevels(page) for page in range(1, self.deep_pages + 1)), return_exceptions=True)
+		self.scheduler.spend(len(pages))
+		await self.db.increase_stat("requests", len(pages))
+
+		# levels sent while the pages were fetched shift the list down, so a level can show up twice
+		seen_levels = {level["_id"] for level in levels}
+		seen_creators = {creator["_id"] for creator in creators}
+		levels, creators = levels.copy(), creators.copy()
+		for page in pages:
+			if isinstance(page, (Ratelimited, Banned)):
+				raise page
+			if isinstance(page, Exception):
+				logging.error(f"Error fetching extra sent page: {page}", exc_info=page)
+				break # later pages would leave a gap
+
+			page_levels, page_creators = page
+			levels += [level for level in page_levels if level["_id"] not in seen_levels]
+			creators += [creator for creator in page_creators if creator["_id"] not in seen_creators]
+			seen_levels.update(level["_id"] for level in page_levels)
+			seen_creators.update(creator["_id"] for creator in page_creators)
 
-		headers = {
-			"User-Agent": ""
-		}
+		return levels, creators
 
-		req = requests.post('http://www.boomlings.com/database/getGJLevels21.php', data=data, headers=headers)
-		SentChecker.check_errors(req)
-
-		if req.text == "-1": return [], []
-
-		parsed = req.text.split("#")
-		rawLevels = parsed[0].split("|")
-		rawCreators = parsed[1].split("|")
-
-		levels = []
-
-		for level in rawLevels:
-			parts = level.split(":")
-			data = {parts[i]: parts[i + 1] for i in range(0, len(parts), 2)}
-			_15 = int(data.get("15", 0))
-			_18 = int(data.get("18", 0))
-			_42 = int(data.get("42", 0))
-			levels.append({
-				"_id": int(data["1"]),
-				"name": data["2"],
-				"creatorID": int(data["6"]),
-				"length": _15,
-				"platformer": (_15 == 5),
-				"difficulty": DEMON_MAP.get(int(data.get("43", 3)), 0),
-				"stars": _18,
-				"points": (1 if _18 > 0 else 0) + (1 if int(data.get("19", 0)) > 0 else 0) + (_42 if _42 > 0 else 0) # https://github.com/RedLime/DemonObserver/blob/1.2-master/src/classes/demon.js#L4
-			})
-
-		creators = []
-
-		for creator in rawCreators:
-			parts = creator.split(":")
-			creators.append({
-				"_id": int(parts[0]),
-				"name": parts[1],
-				"accountID": int(parts[2])
-			})
+	async def getRatedLevels(self) -> tuple[list[dict], list[dict]]:
+		levels, creators = await self.getLevels(11, RATED_LEVEL) # rated levels type
+		for level in levels:
+			rated_level(level)
 
 		return levels, creators
 
-	@staticmethod
-	def check_account(username) -> tuple[str, int, int]:
+	async def check_account(self, username) -> tuple[str, int, int]:
 		data = {
 			"str": username,
 			"secret": "Wmfd2893gb7"
 		}
 
-		headers = {
-			"User-Agent": ""
-		}
-
-		req = requests.post('http://www.boomlings.com/database/getGJUsers20.php', data=data, headers=headers)
+		text = await self.post('http://www.boomlings.com/database/getGJUsers20.php', data)
+		SentChecker.check_errors(text)
 
-		if req.text == "-1": return "", 0, 0
+		if text == "-1": return "", 0, 0
 
-		split = req.text.split(":")
-		pairs = {int(split[i]): split[i+1] for i in range(0, len(split), 2)}
-
-		return pairs[1], int(pairs[2]), int(pairs[16])
+		users, _ = gj.parse_users(text)
+		return users[0]["name"], users[0]["playerID"], users[0]["accountID"]
 
 	def queue_check(self, username: str, callback: Callable, user: int, *args):
 		"""Queue a username for checking, avoiding duplicates."""
-		with self.lock:
-			if username in self.pending_checks:
-				# Add the callback to the existing list
-				self.pending_checks[username].append((callback, args, user))
-			else:
-				# Add a new entry and queue the username
-				self.pending_checks[username] = [(callback, args, user)]
-				self.q.put(username)
-
-	def is_user_pending(self, checkUser: int):
+		if self.account_task is not None and self.account_task.done():
+			asyncio.create_task(callback("", 0, 0, *args))
+			return
+
+		self.pending_users[user] = username
+		if username in self.pending_checks:
+			# Add the callback to the existing list
+			self.pending_checks[username].append((callback, args, user))
+		else:
+			# Add a new entry and queue the username
+			self.pending_checks[username] = [(callback, args, user)]
+			self.queue_positions[username] = self.enqueued
+			self.queue_order.append((self.enqueued, username))
+			self.enqueued += 1
+			self.pending_event.set()
+
+	def is_user_pending(self, checkUser: int) -> bool:
 		"""Check if a user is already pending."""
-		with self.lock:
-			for callbacks in self.pending_checks.values():
-				for _, _, user in callbacks:
-					if user == checkUser:
-						return True
-		return False
-
-	def approximate_wait_time(self, user: int) -> float:
-		"""Estimate the approximate wait time based on the number of pending checks."""
-		waitTime = 5
-		with self.lock:
-			for username, callbacks in self.pending_checks.items():
-				for _, _, checkUser in callbacks:
-					if checkUser == user:
-						break
-				waitTime += 10
-
-		return waitTime
+		return checkUser in self.pending_users
+
+	def queue_position(self, username: str) -> Optional[int]:
+		"""Number of usernames queued before this one that are still pending, or None if it isn't pending"""
+		position = self.queue_positions.get(username)
+		if position is None:
+			return None
+
+		# drop resolved usernames from the front; each is only popped once
+		while self.queue_order and self.queue_positions.get(self.queue_order[0][1]) != self.queue_order[0][0]:
+			self.queue_order.popleft()
+
+		# usernames resolved out of order (known locally) are still counted, so this is an upper bound
+		return position - self.queue_order[0][0]
+
+	def approximate_wait_time(self, user: int) -> int:
+		"""Estimate the seconds until a user's check completes, from the measured account round time."""
+		username = self.pending_users.get(user)
+		position = self.queue_position(username) if username is not None else None
+		if position is None:
+			return 0
+
+		rounds = position // self.account_batch + 1
+		return math.ceil(rounds * self.round_time)
 
 	@staticmethod
-	def check_errors(req):
-		if req.text == "error code: 1015": # ratelimited
+	def check_errors(text: str):
+		if text == "error code: 1015": # ratelimited
 			logging.warning("Ratelimited!")
 			raise Ratelimited()
 
-		if req.text == "error code: 1005": # asn ban
+		if text == "error code: 1005": # asn ban
 			logging.warning("ASN Banned!")
 			raise Banned()
 
-		if req.text == "error code: 1006": # ip ban
+		if text == "error code: 1006": # ip ban
 			logging.warning("IP Banned!")
 			raise Banned()
\ No newline at end of file